@@ -5,11 +5,15 @@ from typing import List, Dict, Optional
 import git 
 import os
 import sys
+import time
 
 
 # Utilisation d'une importation relative pour le module logger
 # Cela suppose que le fichier logger.py est dans le même répertoire que app.py
-from logger import setup_logging
+from logger import setup_logging, setup_slow_request_log
+from compression import setup_compression
+from metrics import setup_metrics
+from profiling import setup_profiling
 
 # Importation des Blueprints
 from routes.apps.applications import applications_bp
@@ -17,6 +21,80 @@ from routes.apps.components import components_bp
 from routes.apps.substitutes import substitutes_bp
 from routes.apps.ingress_annotations import ingress_annotations_bp
 from routes.sync import sync_bp
+from routes.health import health_bp
+
+from config import CATALOG_SETTINGS, COMPRESSION_SETTINGS, PROFILING_SETTINGS
+from services.apps import applications_service, components_service, substitutes_service, ingress_annotations_service
+from services.apps.snapshot import CatalogSnapshot
+from services.apps.watcher import CatalogWatcher
+from services.apps import warmup
+from services import git_service
+
+
+# Défini par gunicorn.conf.py : l'application est chargée dans le maître (preload_app)
+# puis héritée par les workers, qui appellent start_worker_tasks() après le fork
+PRELOADED = os.environ.get('GUNICORN_PRELOAD') == '1'
+
+
+def setup_catalog_snapshot(app):
+    """
+    Recharge le snapshot du catalogue (si configuré) et le réécrit après les
+    requêtes ayant modifié le catalogue, une fois la réponse envoyée.
+    """
+    snapshot_path = CATALOG_SETTINGS.get('snapshot_path')
+    if not snapshot_path:
+        return None
+
+    snapshot = CatalogSnapshot(
+        snapshot_path,
+        applications_service.catalog,
+        {
+            'components': components_service.registry,
+            'substitutes': substitutes_service.registry,
+            'ingress_annotations': ingress_annotations_service.registry,
+        },
+        min_interval=CATALOG_SETTINGS.get('snapshot_interval', 30),
+    )
+    if snapshot.restore():
+        app.logger.info(f"Snapshot du catalogue chargé depuis {snapshot_path}")
+
+    @app.after_request
+    def save_catalog_snapshot(response):
+        response.call_on_close(snapshot.save_if_stale)
+        return response
+
+    return snapshot
+
+
+def setup_catalog_watcher(app):
+    """
+    Démarre (si configuré) la surveillance des fichiers de métadonnées, qui
+    répercute les modifications externes dans le catalogue en mémoire.
+    """
+    if not CATALOG_SETTINGS.get('watch'):
+        return None
+
+    watcher = CatalogWatcher(
+        applications_service.catalog,
+        [components_service.registry, substitutes_service.registry, ingress_annotations_service.registry],
+        debounce=CATALOG_SETTINGS.get('watch_debounce', 0.2),
+        poll_interval=CATALOG_SETTINGS.get('watch_poll_interval', 2),
+        backend=CATALOG_SETTINGS.get('watch_backend', 'auto'),
+    )
+    watcher.start()
+    app.logger.info("Surveillance des fichiers de métadonnées démarrée")
+    return watcher
+
+def start_worker_tasks(app):
+    """
+    Démarre les tâches propres à un worker après le fork (hook post_fork de
+    gunicorn) : les threads du maître ne sont pas copiés dans les workers.
+    Chaque worker a sa propre copie du catalogue et surveille donc lui-même
+    les fichiers.
+    """
+    if PRELOADED:
+        setup_catalog_watcher(app)
+
 def create_app():
     """
     Fonction de fabrique pour créer et configurer l'application Flask.
@@ -26,35 +104,65 @@ def create_app():
     # Configuration du logger
     setup_logging(app, log_level='DEBUG')
 
+    # Durée des requêtes et exposition des métriques Prometheus sur /metrics
+    setup_metrics(app)
+
+    # Profilage à la demande et journal des requêtes lentes
+    setup_slow_request_log(app, PROFILING_SETTINGS.get('slow_log_path'))
+    setup_profiling(app, PROFILING_SETTINGS, applications_service.catalog)
+
     # Enregistrement des Blueprints avec leur préfixe d'URL
     app.register_blueprint(applications_bp, url_prefix='/apps')
     app.register_blueprint(components_bp, url_prefix='/apps')
     app.register_blueprint(substitutes_bp, url_prefix='/apps')
     app.register_blueprint(sync_bp, url_prefix='/')
     app.register_blueprint(ingress_annotations_bp, url_prefix='/apps')
+    app.register_blueprint(health_bp)
+
+    # Snapshot du catalogue analysé, pour un démarrage rapide des workers
+    setup_catalog_snapshot(app)
+
+    # Compression des réponses et cache longue durée des fichiers statiques
+    setup_compression(app, COMPRESSION_SETTINGS)
     """
     Vérifie si le dépôt existe et le clone si ce n'est pas le cas.
     Utilise les variables d'environnement REPO_URL et REPO_PATH.
     """
     repo_url = os.environ.get('REPO_URL')
     repo_path = os.environ.get('REPO_PATH')
+    setup_error = None
     if not repo_url or not repo_path:
+        # L'application est tout de même construite : /healthz répond, /readyz signale l'erreur
         app.logger.error("Les variables d'environnement REPO_URL ou REPO_PATH ne sont pas définies.")
-        return
-
+        setup_error = "REPO_URL ou REPO_PATH non défini"
     # Vérifie si le chemin d'accès existe déjà
-    if os.path.exists(repo_path):
+    elif os.path.exists(repo_path):
         app.logger.error(f"Le dépôt existe déjà à l'emplacement {repo_path}")
     else:
         app.logger.info(f"Clonage du dépôt depuis {repo_url} vers {repo_path}")
         try:
             # Crée le répertoire parent si nécessaire
             os.makedirs(os.path.dirname(repo_path), exist_ok=True)
-            # Clone le dépôt
-            git.Repo.clone_from(repo_url, repo_path)
-            app.logger.info("Clonage réussi.")
+            # Clone le dépôt (historique, contenu et répertoires limités selon config.yaml)
+            start = time.monotonic()
+            git_service.clone(repo_url, repo_path)
+            app.logger.info(f"Clonage réussi en {time.monotonic() - start:.1f} s.")
         except git.GitCommandError as e:
-            app.logger.rror(f"Erreur lors du clonage du dépôt : {e}")
+            app.logger.error(f"Erreur lors du clonage du dépôt : {e}")
+            setup_error = f"Échec du clonage du dépôt : {e}"
+
+    # Préchauffage : catalogue, index du graphe et réponses principales sont
+    # prêts avant le premier trafic (une seule fois, dans le maître, avec preload_app).
+    # Sans dépôt, le processus reste non prêt (/readyz) plutôt que de servir un catalogue vide.
+    if setup_error:
+        warmup.fail(app, setup_error)
+    else:
+        warmup.warm_up(app)
+
+    # Répercussion des modifications externes (git pull, éditions manuelles) ;
+    # avec preload_app, démarrée dans chaque worker (start_worker_tasks)
+    if not PRELOADED:
+        setup_catalog_watcher(app)
 
     @app.route('/')
     def index():
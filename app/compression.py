@@ -0,0 +1,181 @@
+# backend/compression.py
+"""
+Compression des réponses HTTP.
+
+- Réponses dynamiques (JSON, pages HTML) : gzip ou brotli selon
+  l'en-tête Accept-Encoding, au-delà d'une taille minimale, avec des
+  niveaux modérés pour limiter le coût CPU.
+- Fichiers statiques : compressés une fois au niveau maximal, servis avec
+  une empreinte de contenu dans l'URL (?v=...) et un cache navigateur longue
+  durée lorsque l'empreinte correspond.
+
+Brotli n'est proposé que si le paquet 'brotli' est installé.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'image/svg+xml',
+}
+
+# Nombre de corps compressés conservés (réponses portant un ETag, voir routes/http_cache.py)
+MAX_CACHED_BODIES = 64
+
+
+def _encodings():
+    """Encodages proposés, par ordre de préférence à qualité égale."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def _negotiate():
+    return request.accept_encodings.best_match(_encodings())
+
+
+def _compress(data, encoding, gzip_level, brotli_quality):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 : une sortie identique pour un même contenu
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class StaticAssets:
+    """
+    Empreintes et versions compressées des fichiers statiques, recalculées
+    lorsqu'un fichier change sur le disque.
+    """
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self._assets = {}  # chemin relatif -> (mtime, empreinte, {encodage: octets})
+        self._lock = threading.Lock()
+
+    def get(self, filename):
+        """Retourne (empreinte, {encodage: octets}) ou None si le fichier n'existe pas."""
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        with self._lock:
+            asset = self._assets.get(filename)
+            if asset is None or asset[0] != mtime:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                encoded = {encoding: _compress(data, encoding, 9, 11) for encoding in _encodings()}
+                # Inutile de servir une version compressée plus grosse que l'originale
+                encoded = {encoding: body for encoding, body in encoded.items() if len(body) < len(data)}
+                asset = (mtime, hashlib.sha1(data).hexdigest()[:12], encoded)
+                self._assets[filename] = asset
+            return asset[1], asset[2]
+
+    def precompress(self):
+        """Compresse à l'avance tous les fichiers du répertoire statique."""
+        for root, dirs, files in os.walk(self.static_folder):
+            for file in files:
+                self.get(os.path.relpath(os.path.join(root, file), self.static_folder))
+
+
+def setup_compression(app, settings):
+    """
+    Active la compression des réponses et le cache longue durée des fichiers
+    statiques. 'settings' est la section 'compression' de config.yaml.
+    """
+    min_size = settings.get('min_size', 1024)
+    gzip_level = settings.get('gzip_level', 6)
+    brotli_quality = settings.get('brotli_quality', 5)
+    static_max_age = settings.get('static_max_age', 31536000)
+
+    assets = StaticAssets(app.static_folder)
+    assets.precompress()
+
+    @app.url_defaults
+    def add_static_version(endpoint, values):
+        # url_for('static', ...) ajoute l'empreinte du contenu : l'URL change avec le fichier
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            asset = assets.get(values['filename'])
+            if asset:
+                values['v'] = asset[0]
+
+    static_view = app.view_functions['static']
+
+    def send_static(filename):
+        response = static_view(filename=filename)
+        asset = assets.get(filename)
+        if asset is None or response.status_code != 200:
+            return response
+        fingerprint, encoded = asset
+        if request.args.get('v') == fingerprint:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = static_max_age
+            response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(list(encoded))
+        if encoding:
+            # Remplace le fichier ouvert par sa version précompressée
+            response.response.close()
+            response.direct_passthrough = False
+            response.set_data(encoded[encoding])
+            response.headers['Content-Encoding'] = encoding
+            etag, _ = response.get_etag()
+            if etag:
+                response.set_etag(etag, weak=True)
+        return response
+
+    app.view_functions['static'] = send_static
+
+    compressed_bodies = OrderedDict()  # (etag, encodage) -> octets
+    lock = threading.Lock()
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = _negotiate()
+        if not encoding or response.content_length is None or response.content_length < min_size:
+            return response
+
+        etag, _ = response.get_etag()
+        key = (etag, encoding)
+        with lock:
+            body = compressed_bodies.get(key) if etag else None
+            if body is not None:
+                compressed_bodies.move_to_end(key)
+        if etag:
+            metrics.cache_result('compression', body is not None)
+        if body is None:
+            body = _compress(response.get_data(), encoding, gzip_level, brotli_quality)
+            if etag:
+                with lock:
+                    compressed_bodies[key] = body
+                    while len(compressed_bodies) > MAX_CACHED_BODIES:
+                        compressed_bodies.popitem(last=False)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            # Même ressource, autre représentation : l'ETag devient faible et
+            # reste reconnu par If-None-Match (comparaison faible)
+            response.set_etag(etag, weak=True)
+        return response
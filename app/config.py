@@ -15,5 +15,19 @@ def load_config(config_path='config.yaml'):
         print("Erreur: La clé 'data_paths' est manquante dans le fichier de configuration.")
         return {}
 
+def load_section(section, config_path='config.yaml'):
+    """Charge une section optionnelle du fichier de configuration (dictionnaire vide si absente)."""
+    try:
+        with open(config_path, 'r') as file:
+            config = yaml.safe_load(file) or {}
+            return config.get(section) or {}
+    except FileNotFoundError:
+        return {}
+
 # Charger la configuration une seule fois au démarrage
-DATA_PATHS = load_config()
\ No newline at end of file
+DATA_PATHS = load_config()
+CATALOG_SETTINGS = load_section('catalog')
+GIT_SETTINGS = load_section('git')
+COMPRESSION_SETTINGS = load_section('compression')
+PERSISTENCE_SETTINGS = load_section('persistence')
+PROFILING_SETTINGS = load_section('profiling')
\ No newline at end of file
@@ -1,4 +1,4 @@
-import yaml
+import yaml_io
 import os
 from typing import List, Dict
 
@@ -9,7 +9,7 @@ def load_yaml_files_recursively(directory: str) -> List[Dict]:
             if file.endswith((".yaml", ".yml")):
                 path = os.path.join(root, file)
                 with open(path, 'r') as f:
-                    yamls.append(yaml.safe_load(f))
+                    yamls.append(yaml_io.safe_load(f))
     return yamls
 
 def extract_requirements(configs: List[Dict]):
@@ -0,0 +1,43 @@
+# backend/gunicorn.conf.py
+"""
+Configuration gunicorn : gunicorn -c gunicorn.conf.py app:app
+
+L'application est chargée une seule fois dans le maître (preload_app) :
+clone, analyse du catalogue, index du graphe et réponses principales y sont
+préparés avant la création des workers, qui en héritent par copie sur
+écriture. Aucun worker ne reçoit de requête sur un catalogue froid.
+"""
+import gc
+import os
+import shutil
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+preload_app = True
+# Le préchauffage d'un gros dépôt peut dépasser le délai par défaut
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+# Lu par app.py au chargement (dans le maître)
+os.environ['GUNICORN_PRELOAD'] = '1'
+
+# Métriques Prometheus agrégées entre les workers (voir metrics.py) : le
+# répertoire doit être défini avant le chargement de l'application et vidé à chaque démarrage
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/home-k8s-metadata/prometheus')
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def when_ready(server):
+    # Objets chargés par le maître exclus du ramasse-miettes : ses passages ne
+    # modifient plus leurs pages, qui restent partagées avec les workers
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import app, start_worker_tasks
+    start_worker_tasks(app)
+
+
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
@@ -1,6 +1,7 @@
 # backend/logger.py
 import logging
 import os
+import sys
 from logging.handlers import RotatingFileHandler
 
 # Configuration des niveaux de verbosité
@@ -37,4 +38,20 @@ def setup_logging(app, log_level='INFO'):
     # pour que tous les logs (y compris ceux des librairies) soient capturés
     root_logger = logging.getLogger()
     root_logger.addHandler(handler)
-    root_logger.setLevel(log_level)
\ No newline at end of file
+    root_logger.setLevel(log_level)
+
+
+def setup_slow_request_log(app, path=None, max_bytes=10 * 1024 * 1024, backup_count=5):
+    """
+    Configure le journal des requêtes lentes (logger '<app>.slow_requests').
+    Les messages suivent le logger de l'application ; si 'path' est fourni,
+    ils sont aussi écrits dans un fichier à rotation.
+    """
+    slow_logger = app.logger.getChild('slow_requests')
+    slow_logger.setLevel(logging.WARNING)
+    if path and not slow_logger.handlers:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(process)d - %(message)s'))
+        slow_logger.addHandler(handler)
+    return slow_logger
\ No newline at end of file
@@ -0,0 +1,144 @@
+# backend/metrics.py
+"""
+Métriques Prometheus, exposées sur /metrics.
+
+- Durée des requêtes HTTP par route (histogramme).
+- Fichiers YAML analysés et temps d'analyse, taille du catalogue.
+- Succès et échecs des caches (corps JSON, bundle d'amorçage, compression).
+- Durée et échecs des opérations git (pull / push).
+- Octets écrits par les services (applications et registres).
+
+Avec plusieurs workers gunicorn, définir PROMETHEUS_MULTIPROC_DIR (répertoire
+vide au démarrage, partagé par les workers) : chaque processus y écrit ses
+valeurs et /metrics agrège celles de tous les workers, quel que soit celui
+qui répond. Le maître doit appeler mark_process_dead() à la sortie d'un
+worker (hook child_exit de gunicorn).
+
+Sans le paquet 'prometheus_client', les métriques sont sans effet et
+/metrics n'est pas enregistré.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Bornes (secondes) des histogrammes de durée des requêtes : de la réponse en
+# cache (quelques centaines de µs) au rendu complet d'un gros catalogue
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+GIT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class _NoopMetric:
+    """Remplace une métrique lorsque prometheus_client n'est pas installé."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+if prometheus_client is not None:
+    REQUEST_SECONDS = prometheus_client.Histogram(
+        'http_request_duration_seconds', "Durée de traitement des requêtes HTTP",
+        ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+    YAML_FILES_PARSED = prometheus_client.Counter(
+        'yaml_files_parsed_total', "Fichiers YAML analysés", ['kind'])
+    YAML_PARSE_SECONDS = prometheus_client.Counter(
+        'yaml_parse_seconds_total', "Temps passé à analyser des fichiers YAML", ['kind'])
+    YAML_PARSE_ERRORS = prometheus_client.Counter(
+        'yaml_parse_errors_total', "Fichiers YAML illisibles", ['kind'])
+    CATALOG_APPLICATIONS = prometheus_client.Gauge(
+        'catalog_applications', "Nombre d'applications dans le catalogue",
+        multiprocess_mode='livemostrecent')
+    CACHE_REQUESTS = prometheus_client.Counter(
+        'cache_requests_total', "Accès aux caches de réponses", ['cache', 'result'])
+    GIT_OPERATION_SECONDS = prometheus_client.Histogram(
+        'git_operation_duration_seconds', "Durée des opérations git", ['operation'], buckets=GIT_BUCKETS)
+    GIT_OPERATION_FAILURES = prometheus_client.Counter(
+        'git_operation_failures_total', "Opérations git en échec", ['operation'])
+    BYTES_WRITTEN = prometheus_client.Counter(
+        'save_data_bytes_total', "Octets écrits sur le disque par les services", ['service'])
+else:
+    REQUEST_SECONDS = YAML_FILES_PARSED = YAML_PARSE_SECONDS = YAML_PARSE_ERRORS = _NoopMetric()
+    CATALOG_APPLICATIONS = CACHE_REQUESTS = GIT_OPERATION_SECONDS = GIT_OPERATION_FAILURES = _NoopMetric()
+    BYTES_WRITTEN = _NoopMetric()
+
+
+def cache_result(cache, hit):
+    """Compte un accès au cache 'cache' (succès ou échec)."""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_write(service, text):
+    """Compte les octets d'un contenu écrit par 'service'."""
+    BYTES_WRITTEN.labels(service).inc(len(text.encode('utf-8')))
+
+
+@contextmanager
+def git_operation(operation):
+    """Mesure la durée d'une opération git et compte ses échecs."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        GIT_OPERATION_FAILURES.labels(operation).inc()
+        raise
+    finally:
+        GIT_OPERATION_SECONDS.labels(operation).observe(time.perf_counter() - start)
+
+
+def mark_process_dead(pid):
+    """À appeler par le maître gunicorn (child_exit) en mode multiprocessus."""
+    if prometheus_client is not None and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+def _registry():
+    if MULTIPROC_DIR:
+        # Agrège les fichiers de valeurs de tous les workers
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prometheus_client.REGISTRY
+
+
+def setup_metrics(app):
+    """Mesure la durée de chaque requête et expose /metrics."""
+    if prometheus_client is None:
+        app.logger.info("prometheus_client n'est pas installé : /metrics est désactivé")
+        return False
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            # Le motif de la route (et non l'URL) borne le nombre de séries
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(time.perf_counter() - start)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(prometheus_client.generate_latest(_registry()), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+    return True
@@ -0,0 +1,155 @@
+# backend/profiling.py
+"""
+Diagnostic des requêtes lentes.
+
+- Profilage cProfile à la demande : toutes les requêtes si la variable
+  d'environnement PROFILE_REQUESTS vaut 1, ou seulement celles portant un
+  en-tête X-Profile signé avec le secret PROFILE_SECRET (voir sign()). Le
+  profil est écrit dans 'profile_dir' (lisible avec pstats ou snakeviz) et
+  son nom renvoyé dans l'en-tête X-Profile-File.
+- Journal des requêtes lentes, toujours actif : au-delà de 'slow_threshold'
+  secondes, la route, la durée, la taille du catalogue et les fonctions les
+  plus souvent observées sont journalisées. Ces fonctions proviennent d'un
+  échantillonneur qui relève la pile des requêtes en cours toutes les
+  'sample_interval' secondes ; il ne tourne que pendant les requêtes.
+"""
+import cProfile
+import hashlib
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import g, request
+
+# Durée de validité (secondes) d'un en-tête X-Profile signé
+SIGNATURE_TTL = 300
+
+
+def sign(method, path, secret, timestamp=None):
+    """
+    Construit la valeur de l'en-tête X-Profile pour une requête :
+    '<timestamp>:<HMAC-SHA256 de "timestamp:METHOD:path">'.
+    """
+    timestamp = str(int(timestamp if timestamp is not None else time.time()))
+    digest = hmac.new(secret.encode('utf-8'), f"{timestamp}:{method}:{path}".encode('utf-8'), hashlib.sha256)
+    return f"{timestamp}:{digest.hexdigest()}"
+
+
+def _valid_signature(value, secret):
+    timestamp, _, _ = value.partition(':')
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_TTL:
+        return False
+    return hmac.compare_digest(value, sign(request.method, request.path, secret, int(timestamp)))
+
+
+class StackSampler:
+    """
+    Échantillonneur de piles : compte, pour chaque thread enregistré, la
+    fonction en cours d'exécution à chaque relevé.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._active = {}  # identifiant de thread -> Counter des fonctions observées
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._condition:
+            self._active[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def stop(self, thread_id):
+        """Arrête l'échantillonnage d'un thread et retourne ses relevés."""
+        with self._condition:
+            return self._active.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # Aucun relevé tant qu'aucune requête n'est en cours
+                while not self._active:
+                    self._condition.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._condition:
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        code = frame.f_code
+                        samples[f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"] += 1
+
+
+def _profile_filename(route):
+    name = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{name}-{os.getpid()}-{threading.get_ident()}.prof"
+
+
+def setup_profiling(app, settings, catalog=None):
+    """
+    Active le profilage à la demande et le journal des requêtes lentes.
+    'settings' est la section 'profiling' de config.yaml ; 'catalog' (le
+    catalogue des applications) fournit la taille du catalogue journalisée.
+    """
+    profile_dir = settings.get('profile_dir', '/tmp/home-k8s-metadata/profiles')
+    slow_threshold = settings.get('slow_threshold', 1.0)
+    top_functions = settings.get('top_functions', 10)
+    profile_all = os.environ.get('PROFILE_REQUESTS') == '1'
+    secret = os.environ.get('PROFILE_SECRET')
+    sampler = StackSampler(settings.get('sample_interval', 0.005)) if slow_threshold else None
+    slow_logger = app.logger.getChild('slow_requests')
+
+    @app.before_request
+    def start_diagnostics():
+        g.request_start = time.perf_counter()
+        if sampler is not None:
+            sampler.start(threading.get_ident())
+        header = request.headers.get('X-Profile')
+        if profile_all or (secret and header and _valid_signature(header, secret)):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_diagnostics(response):
+        start = g.pop('request_start', None)
+        if start is None:
+            return response
+        duration = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            try:
+                os.makedirs(profile_dir, exist_ok=True)
+                filename = _profile_filename(route)
+                profiler.dump_stats(os.path.join(profile_dir, filename))
+                response.headers['X-Profile-File'] = filename
+            except OSError as e:
+                app.logger.error(f"Impossible d'écrire le profil de {request.path} : {e}")
+
+        if sampler is not None:
+            samples = sampler.stop(threading.get_ident())
+            if duration >= slow_threshold:
+                hot = ', '.join(f"{function} x{count}" for function, count in samples.most_common(top_functions))
+                slow_logger.warning(
+                    f"Requête lente : {request.method} {route} {response.status_code} en {duration * 1000:.0f} ms, "
+                    f"{catalog.size() if catalog is not None else '?'} applications, "
+                    f"fonctions les plus observées : {hot or 'aucune'}")
+        return response
+
+    @app.teardown_request
+    def cleanup_diagnostics(exc):
+        # Requête interrompue avant after_request
+        if g.pop('request_start', None) is not None and sampler is not None:
+            sampler.stop(threading.get_ident())
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, Response, request, jsonify, render_template
 
 # 🎯 Importez correctement tous les services nécessaires
 # Make sure to import the services you need here.
-from services.apps import applications_service, components_service, substitutes_service, ingress_annotations_service
+from services.apps import applications_service
+from services.apps import bootstrap_service, dependency_index, export, persistence
+from routes import http_cache
 
 applications_bp = Blueprint('applications', __name__)
 
@@ -15,33 +17,83 @@ def global_dependency_graph_page():
 @applications_bp.route('/api/applications/global-graph-data', methods=['GET'])
 def get_global_graph_data():
     try:
-        graph_data = applications_service.get_all_dependencies_graph_data()
-        return jsonify(graph_data)
+        return http_cache.cached_json(
+            'global_graph_data',
+            applications_service.data_version(),
+            applications_service.get_all_dependencies_graph_data,
+        )
     except Exception as e:
         print(f"Erreur lors de la génération du graphe global : {e}")
         return jsonify({'error': 'Erreur interne du serveur'}), 500
         
 
+@applications_bp.route('/api/applications/cycles', methods=['GET'])
+def get_dependency_cycles():
+    cycles = applications_service.get_dependency_cycles()
+    return jsonify({'cycles': cycles, 'count': len(cycles)})
+
+@applications_bp.route('/api/applications/topological-order', methods=['GET'])
+def get_topological_order():
+    order = applications_service.get_topological_order()
+    return jsonify({'order': order, 'has_cycles': bool(applications_service.get_dependency_cycles())})
+
+@applications_bp.route('/api/applications/reachability', methods=['GET'])
+def get_reachability():
+    """
+    Indique si 'upstream' est en amont de 'downstream' (ids 'name:namespace'),
+    c'est-à-dire si downstream en dépend directement ou transitivement.
+    """
+    upstream = request.args.get('upstream')
+    downstream = request.args.get('downstream')
+    if not upstream or not downstream:
+        return jsonify({'error': 'Paramètres upstream et downstream requis (name:namespace)'}), 400
+    return jsonify({
+        'upstream': upstream,
+        'downstream': downstream,
+        'is_upstream': applications_service.is_upstream(upstream, downstream),
+    })
+
+@applications_bp.route('/api/applications/export', methods=['GET'])
+def export_applications():
+    """
+    Export en flux de tout le catalogue : ?format=ndjson (défaut) ou msgpack,
+    &gzip=1 pour compresser (Content-Encoding: gzip).
+    """
+    fmt = request.args.get('format', export.NDJSON)
+    if fmt not in export.available_formats():
+        return jsonify({'error': f"Format non disponible, formats acceptés : {', '.join(export.available_formats())}"}), 400
+    compress = request.args.get('gzip') in ('1', 'true')
+
+    chunks = export.iter_export(applications_service.iter_applications(), fmt, compress)
+    response = Response(chunks, mimetype=export.MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=applications.{fmt}'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 # Your route to display the applications page
 @applications_bp.route('/applications')
 def applications_page():
-    applications = applications_service.load_data()
-    components = components_service.load_data()
-    substitutes = substitutes_service.load_data()
-    ingress_annotations = ingress_annotations_service.load_data()
-    return render_template(
-        'apps/applications.html',
-        applications=applications,
-        components=components,
-        substitutes=substitutes,
-        ingress_annotations=ingress_annotations
+    # Page rendue une fois par version des données, avec ETag (304 et version compressée réutilisée)
+    version = bootstrap_service.bundle_version()
+    return http_cache.cached_html(
+        'applications_page',
+        version,
+        lambda: render_template('apps/applications.html', **bootstrap_service.get_bundle(version)),
     )
+
+# Données d'amorçage de la page des applications, en un seul appel
+@applications_bp.route('/api/bootstrap', methods=['GET'])
+def get_bootstrap():
+    version = bootstrap_service.bundle_version()
+    return http_cache.cached_json('bootstrap', version, lambda: bootstrap_service.get_bundle(version))
 @applications_bp.route('/api/applications/dependencies', methods=['POST'])
 def get_dependencies_graph():
     data = request.json
     app_name = data.get('app_name')
     app_namespace = data.get('app_namespace')
     depth_str = data.get('depth', '2')
+    direction = data.get('direction', 'dependencies')
 
     try:
         depth = int(depth_str) if depth_str != 'all' else float('inf')
@@ -50,20 +102,67 @@ def get_dependencies_graph():
 
     if not app_name or not app_namespace:
         return jsonify({'error': 'Nom et namespace de l\'application requis'}), 400
+    if direction not in dependency_index.DIRECTIONS:
+        return jsonify({'error': f"Direction invalide : {', '.join(dependency_index.DIRECTIONS)} attendu"}), 400
 
     try:
         # The applications_service is now correctly defined here.
-        graph_data = applications_service.get_dependency_tree(app_name, app_namespace, depth)
+        graph_data = applications_service.get_dependency_tree(app_name, app_namespace, depth, direction)
         return jsonify(graph_data)
     except Exception as e:
         print(f"Erreur lors de la génération du graphe de dépendances : {e}")
         return jsonify({'error': 'Erreur interne du serveur'}), 500
 
+# Filtres acceptés par GET /api/applications (paramètre de requête -> critère du catalogue)
+APPLICATION_FILTERS = {
+    'namespace': 'namespace',
+    'base': 'base',
+    'component': 'component',
+    'substitute': 'substitute',
+    'name_prefix': 'name_prefix',
+}
+
+def _parse_application_query(args):
+    """Valide les paramètres de filtrage, pagination et projection. Lève ValueError."""
+    filters = {criterion: args[param] for param, criterion in APPLICATION_FILTERS.items() if args.get(param)}
+    active = args.get('active')
+    if active:
+        if active not in ('true', 'false'):
+            raise ValueError("Le paramètre active doit valoir 'true' ou 'false'")
+        filters['active'] = active == 'true'
+
+    try:
+        offset = int(args.get('offset', 0))
+        limit = int(args['limit']) if args.get('limit') else None
+    except ValueError:
+        raise ValueError("offset et limit doivent être des entiers")
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset et limit doivent être positifs")
+
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+    return filters, offset, limit, fields
+
 # API pour obtenir toutes les applications
+# Paramètres optionnels : namespace, base, component, substitute, active, name_prefix,
+# offset/limit (le total filtré est renvoyé dans l'en-tête X-Total-Count) et fields=a,b,c
 @applications_bp.route('/api/applications', methods=['GET'])
 def get_applications():
-    data = applications_service.load_data()
-    return jsonify(data)
+    if not request.args:
+        return http_cache.cached_json('applications', applications_service.data_version(), applications_service.load_data)
+    version = applications_service.data_version()
+
+    try:
+        filters, offset, limit, fields = _parse_application_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def build():
+        page, total = applications_service.query_applications(filters, offset, limit, fields)
+        return page, {'X-Total-Count': str(total)}
+
+    # Chaque combinaison de paramètres a son propre corps en cache
+    key = ('applications', request.query_string)
+    return http_cache.cached_json(key, version, build)
 
 # Nouvelle API pour obtenir une seule application par son nom et namespace
 @applications_bp.route('/api/applications/<path:namespace>/<path:name>', methods=['GET'])
@@ -87,6 +186,20 @@ def create_application():
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
+# API pour appliquer un lot d'opérations (create / update / delete) en tout ou rien
+@applications_bp.route('/api/applications/batch', methods=['POST'])
+def batch_applications():
+    payload = request.json
+    operations = payload.get('operations') if isinstance(payload, dict) else payload
+    if not isinstance(operations, list):
+        return jsonify({'error': "Liste d'opérations attendue ({'operations': [...]})"}), 400
+
+    try:
+        applied, results = applications_service.apply_batch(operations)
+    except persistence.ConflictError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify({'applied': applied, 'results': results}), 200 if applied else 400
+
 # API pour mettre à jour une application
 @applications_bp.route('/api/applications/<path:namespace>/<path:name>/<path:base>', methods=['PUT'])
 def update_application(base, name, namespace):
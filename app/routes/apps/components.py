@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify, render_template
 # Importer le blueprint (assurez-vous d'avoir le __init__.py qui définit components_bp)
 
-from services.apps import components_service
+from routes import cascade, http_cache
+from services.apps import components_service, references_service
 
 components_bp = Blueprint('components', __name__)
 
@@ -14,8 +15,12 @@ def components_page():
 # API pour obtenir tous les Components
 @components_bp.route('/api/components', methods=['GET'])
 def get_components():
-    data = components_service.load_data()
-    return jsonify(data)
+    return http_cache.cached_json('components', components_service.data_version(), components_service.load_data)
+
+# API pour obtenir le nombre d'applications utilisant chaque Component
+@components_bp.route('/api/components/usage', methods=['GET'])
+def get_components_usage():
+    return jsonify(references_service.usage('components'))
 
 # API pour créer un nouveau Component
 @components_bp.route('/api/components', methods=['POST'])
@@ -35,10 +40,24 @@ def update_component(component_name):
     updated_component_data = request.json
     # Nous utilisons 'path:component_name' pour permettre les slashes dans le nom si besoin,
     # mais soyez prudent avec les IDs basés sur le nom.
-    
+    new_name = (updated_component_data.get('nom') or component_name).strip()
+    with_cascade, dry_run = cascade.options()
+    if dry_run:
+        if not cascade.exists('components', component_name):
+            return jsonify({'error': 'Component not found'}), 404
+        return cascade.dry_run_response('components', component_name, new_name)
+    if with_cascade:
+        refused = cascade.check('components', component_name, new_name)
+        if refused:
+            return refused
+
     updated_component = components_service.update_component(component_name, updated_component_data)
     
     if updated_component:
+        if with_cascade:
+            # Les applications référençant l'ancien nom sont mises à jour
+            return cascade.apply('components', component_name, new_name, jsonify(updated_component),
+                                 lambda: components_service.update_component(new_name, {'nom': component_name}))
         return jsonify(updated_component)
         
     # Cas d'erreur (non trouvé ou nouveau nom déjà existant)
@@ -47,6 +66,21 @@ def update_component(component_name):
 # API pour supprimer un Component (le nom est l'ID)
 @components_bp.route('/api/components/<path:component_name>', methods=['DELETE'])
 def delete_component(component_name):
-    if components_service.delete_component(component_name):
+    with_cascade, dry_run = cascade.options()
+    if dry_run:
+        if not cascade.exists('components', component_name):
+            return jsonify({'error': 'Component not found'}), 404
+        return cascade.dry_run_response('components', component_name)
+    if with_cascade:
+        refused = cascade.check('components', component_name)
+        if refused:
+            return refused
+
+    removed = components_service.delete_component(component_name)
+    if removed:
+        if with_cascade:
+            # Le component est retiré des applications qui l'utilisaient
+            return cascade.apply('components', component_name, None, ('', 204),
+                                 lambda: components_service.restore_component(removed))
         return '', 204
     return jsonify({'error': 'Component not found'}), 404
\ No newline at end of file
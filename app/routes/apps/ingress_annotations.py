@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, render_template
-from services.apps import ingress_annotations_service
+from routes import cascade, http_cache
+from services.apps import ingress_annotations_service, references_service
 ingress_annotations_bp = Blueprint('ingressannotations', __name__)
 
 @ingress_annotations_bp.route('/ingress-annotations')
@@ -8,8 +9,11 @@ def ingress_annotations_page():
 
 @ingress_annotations_bp.route('/api/ingress-annotations', methods=['GET'])
 def get_ingress_annotations():
-    data = ingress_annotations_service.load_data()
-    return jsonify(data)
+    return http_cache.cached_json('ingress_annotations', ingress_annotations_service.data_version(), ingress_annotations_service.load_data)
+
+@ingress_annotations_bp.route('/api/ingress-annotations/usage', methods=['GET'])
+def get_ingress_annotations_usage():
+    return jsonify(references_service.usage('ingress_annotations'))
 
 @ingress_annotations_bp.route('/api/ingress-annotations', methods=['POST'])
 def create_ingress_annotation():
@@ -22,19 +26,43 @@ def create_ingress_annotation():
         return jsonify(annotation), 201
     return jsonify({'error': 'Ce nom existe déjà'}), 409
 
-@ingress_annotations_bp.route('/api/ingress-annotations/<string:old_nom>', methods=['PUT'])
+@ingress_annotations_bp.route('/api/ingress-annotations/<path:old_nom>', methods=['PUT'])
 def update_ingress_annotation(old_nom):
     data = request.json
     new_nom = data.get('nom')
     if not new_nom:
         return jsonify({'error': 'Nouveau nom est requis'}), 400
+    with_cascade, dry_run = cascade.options()
+    if dry_run:
+        if not cascade.exists('ingress_annotations', old_nom):
+            return jsonify({'error': 'Annotation non trouvée'}), 404
+        return cascade.dry_run_response('ingress_annotations', old_nom, new_nom)
+    if with_cascade:
+        refused = cascade.check('ingress_annotations', old_nom, new_nom)
+        if refused:
+            return refused
     annotation = ingress_annotations_service.update_annotation(old_nom, new_nom)
     if annotation:
+        if with_cascade:
+            return cascade.apply('ingress_annotations', old_nom, new_nom, jsonify(annotation),
+                                 lambda: ingress_annotations_service.update_annotation(new_nom, old_nom))
         return jsonify(annotation)
     return jsonify({'error': 'Annotation non trouvée'}), 404
 
-@ingress_annotations_bp.route('/api/ingress-annotations/<string:nom>', methods=['DELETE'])
+@ingress_annotations_bp.route('/api/ingress-annotations/<path:nom>', methods=['DELETE'])
 def delete_ingress_annotation(nom):
-    if ingress_annotations_service.delete_annotation(nom):
+    with_cascade, dry_run = cascade.options()
+    if dry_run:
+        if not cascade.exists('ingress_annotations', nom):
+            return jsonify({'error': 'Annotation non trouvée'}), 404
+        return cascade.dry_run_response('ingress_annotations', nom)
+    if with_cascade:
+        refused = cascade.check('ingress_annotations', nom)
+        if refused:
+            return refused
+    removed = ingress_annotations_service.delete_annotation(nom)
+    if removed:
+        if with_cascade:
+            return cascade.apply('ingress_annotations', nom, None, ('', 204), lambda: ingress_annotations_service.restore_annotation(removed))
         return '', 204
     return jsonify({'error': 'Annotation non trouvée'}), 404
\ No newline at end of file
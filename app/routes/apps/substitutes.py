@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, render_template
-from services.apps import substitutes_service
+from routes import cascade, http_cache
+from services.apps import substitutes_service, references_service
 
 substitutes_bp = Blueprint('substitutes', __name__)
 
@@ -9,8 +10,11 @@ def substitutes_page():
 
 @substitutes_bp.route('/api/substitutes', methods=['GET'])
 def get_substitutes():
-    data = substitutes_service.load_data()
-    return jsonify(data)
+    return http_cache.cached_json('substitutes', substitutes_service.data_version(), substitutes_service.load_data)
+
+@substitutes_bp.route('/api/substitutes/usage', methods=['GET'])
+def get_substitutes_usage():
+    return jsonify(references_service.usage('substitutes'))
 
 @substitutes_bp.route('/api/substitutes', methods=['POST'])
 def create_substitute():
@@ -29,13 +33,37 @@ def update_substitute(old_nom):
     new_nom = data.get('nom')
     if not new_nom:
         return jsonify({'error': 'Nouveau nom est requis'}), 400
+    with_cascade, dry_run = cascade.options()
+    if dry_run:
+        if not cascade.exists('substitutes', old_nom):
+            return jsonify({'error': 'Substitut non trouvé'}), 404
+        return cascade.dry_run_response('substitutes', old_nom, new_nom)
+    if with_cascade:
+        refused = cascade.check('substitutes', old_nom, new_nom)
+        if refused:
+            return refused
     substitute = substitutes_service.update_substitute(old_nom, new_nom)
     if substitute:
+        if with_cascade:
+            return cascade.apply('substitutes', old_nom, new_nom, jsonify(substitute),
+                                 lambda: substitutes_service.update_substitute(new_nom, old_nom))
         return jsonify(substitute)
     return jsonify({'error': 'Substitut non trouvé'}), 404
 
 @substitutes_bp.route('/api/substitutes/<string:nom>', methods=['DELETE'])
 def delete_substitute(nom):
-    if substitutes_service.delete_substitute(nom):
+    with_cascade, dry_run = cascade.options()
+    if dry_run:
+        if not cascade.exists('substitutes', nom):
+            return jsonify({'error': 'Substitut non trouvé'}), 404
+        return cascade.dry_run_response('substitutes', nom)
+    if with_cascade:
+        refused = cascade.check('substitutes', nom)
+        if refused:
+            return refused
+    removed = substitutes_service.delete_substitute(nom)
+    if removed:
+        if with_cascade:
+            return cascade.apply('substitutes', nom, None, ('', 204), lambda: substitutes_service.restore_substitute(removed))
         return '', 204
     return jsonify({'error': 'Substitut non trouvé'}), 404
\ No newline at end of file
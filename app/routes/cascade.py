@@ -0,0 +1,70 @@
+"""
+Répercussion des renommages et suppressions des registres sur les
+applications (voir services/apps/references_service.py).
+
+Paramètres de requête acceptés par les routes PUT et DELETE des registres :
+- cascade=true : répercute aussi le changement sur les applications (par
+  défaut, seul le registre est modifié, comme avant l'ajout de la répercussion) ;
+- dry_run=true : n'écrit rien et retourne la liste des applications concernées.
+
+La répercussion est validée avant la modification du registre (409 si elle
+serait refusée) ; si elle échoue ensuite, la modification du registre est
+annulée. Le nombre d'applications modifiées est renvoyé dans l'en-tête
+X-Cascaded-Applications.
+"""
+from flask import jsonify, make_response, request
+
+from services.apps import persistence, references_service
+
+
+def _flag(name, default):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def options():
+    """Retourne (cascade, dry_run) d'après les paramètres de la requête."""
+    return _flag('cascade', False), _flag('dry_run', False)
+
+
+def exists(kind, name):
+    """Indique si 'name' figure dans le registre 'kind'."""
+    service = references_service.KINDS[kind][3]
+    return any(entry.get('nom') == name for entry in service.load_data())
+
+
+def dry_run_response(kind, old, new=None):
+    """Réponse d'un dry_run : applications et opérations qui seraient appliquées."""
+    summary = references_service.cascade(kind, old, new, dry_run=True)
+    return jsonify(dict(summary, dry_run=True))
+
+
+def check(kind, old, new=None):
+    """
+    À appeler avant de modifier le registre : retourne une réponse 409 si la
+    répercussion serait refusée, None sinon.
+    """
+    try:
+        references_service.check_cascade(kind, old, new)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    return None
+
+
+def apply(kind, old, new, response, undo):
+    """
+    Répercute le changement (déjà appliqué au registre) sur les applications
+    puis ajoute l'en-tête X-Cascaded-Applications à la réponse. En cas
+    d'échec, 'undo' rétablit le registre. Retourne la réponse à envoyer.
+    """
+    try:
+        summary = references_service.cascade(kind, old, new)
+    except (RuntimeError, OSError, persistence.ConflictError) as e:
+        print(f"Erreur lors de la répercussion sur les applications : {e}")
+        undo()
+        return jsonify({'error': str(e)}), 500
+    response = make_response(response)
+    response.headers['X-Cascaded-Applications'] = str(summary['count'])
+    return response
@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+
+from services.apps import warmup
+
+health_bp = Blueprint('health', __name__)
+
+# Sonde de vivacité : le processus répond, sans toucher au catalogue
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({'status': 'ok'})
+
+# Sonde de disponibilité : 503 tant que le préchauffage n'est pas terminé
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    ready, details = warmup.status()
+    return jsonify(details), 200 if ready else 503
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+import metrics
+
+# Nombre maximal de corps conservés (une entrée par endpoint et par combinaison de paramètres)
+MAX_ENTRIES = 256
+
+# Corps déjà sérialisés (JSON ou pages HTML), du moins au plus récemment utilisé :
+# clé -> (version, corps, etag, date de génération, en-têtes)
+_bodies = OrderedDict()
+_lock = threading.Lock()
+
+
+def _serialize(data):
+    # Même sérialisation que jsonify() (mode compact)
+    return current_app.json.dumps(data, separators=(',', ':')) + "\n"
+
+
+def _lookup(key):
+    with _lock:
+        entry = _bodies.get(key)
+        if entry is not None:
+            _bodies.move_to_end(key)
+        return entry
+
+
+def _store(key, entry):
+    with _lock:
+        _bodies[key] = entry
+        _bodies.move_to_end(key)
+        while len(_bodies) > MAX_ENTRIES:
+            _bodies.popitem(last=False)
+
+
+def cached_json(key, version, build):
+    """
+    Réponse JSON conditionnelle (ETag / Last-Modified, 304 sur If-None-Match).
+
+    'version' identifie l'état des données dans ce worker (version du
+    catalogue ou d'un registre) : tant qu'elle ne change pas, le corps
+    sérialisé est réutilisé et 'build' n'est pas appelé. Si 'version' est
+    None, rien n'est mis en cache. 'build' retourne les données, ou un
+    couple (données, en-têtes supplémentaires).
+
+    L'ETag est une empreinte du contenu : elle est identique d'un worker à
+    l'autre, même si leurs compteurs de version diffèrent.
+    """
+    return _cached_response(key, version, build, _serialize, 'application/json')
+
+
+def cached_html(key, version, render):
+    """
+    Page HTML conditionnelle, sur le même principe que cached_json :
+    'render' retourne le HTML et n'est appelé que lorsque 'version' change.
+    L'ETag permet aussi de réutiliser la version compressée de la page.
+    """
+    return _cached_response(key, version, render, lambda html: html, 'text/html')
+
+
+def _cached_response(key, version, build, serialize, mimetype):
+    previous = _lookup(key)
+    entry = previous if version is not None else None
+    hit = entry is not None and entry[0] == version
+    metrics.cache_result('http', hit)
+    if not hit:
+        data = build()
+        headers = {}
+        if isinstance(data, tuple):
+            data, headers = data
+        body = serialize(data).encode('utf-8')
+        etag = hashlib.sha1(body).hexdigest()
+        # Un corps identique (autre version, même contenu) garde sa date d'origine
+        built_at = previous[3] if previous and previous[2] == etag else time.time()
+        entry = (version, body, etag, built_at, headers)
+        if version is not None:
+            _store(key, entry)
+
+    _, body, etag, built_at, headers = entry
+    response = current_app.response_class(body, mimetype=mimetype, headers=headers)
+    response.last_modified = built_at
+    return _conditional(response, etag)
+
+
+def _conditional(response, etag):
+    response.set_etag(etag)
+    # Le client doit revalider à chaque fois, ce qui ne coûte qu'une comparaison d'en-têtes
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
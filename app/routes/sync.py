@@ -1,22 +1,15 @@
 # backend/routes/sync.py
 
-from flask import Blueprint, jsonify, request, render_template
-import os
-import git
+from flask import Blueprint, jsonify, request, render_template, url_for
 
-sync_bp = Blueprint('sync', __name__)
+import metrics
+from services import git_service, git_jobs
 
-# Assurez-vous que cette variable correspond à votre variable d'environnement
-REPO_PATH = os.environ.get('REPO_PATH')
+sync_bp = Blueprint('sync', __name__)
 
 def get_repo():
     """Récupère l'objet git.Repo si le chemin est valide."""
-    if not REPO_PATH or not os.path.exists(REPO_PATH):
-        return None
-    try:
-        return git.Repo(REPO_PATH)
-    except git.InvalidGitRepositoryError:
-        return None
+    return git_service.get_repo()
 
 # Route pour la page de l'interface utilisateur
 @sync_bp.route('/sync')
@@ -26,50 +19,80 @@ def sync_page():
     
     if repo:
         try:
-            # Récupère l'état actuel du dépôt
-            head_commit = repo.head.commit.hexsha[:7]
+            # Récupère l'état actuel du dépôt (mis en cache jusqu'au prochain pull/push)
+            head_commit = git_service.head_commit()[:7]
             status = f"Dépôt prêt. Dernier commit : {head_commit}"
         except Exception as e:
             status = f"Erreur lors de la récupération du statut : {e}"
             
     return render_template('sync.html', status=status)
 
+def _pull_operation(progress):
+    """Pull exécuté en arrière-plan ; le catalogue n'est mis à jour que pour les fichiers modifiés."""
+    repo = get_repo()
+    if not repo:
+        raise RuntimeError('Dépôt non trouvé')
+    with metrics.git_operation('pull'):
+        result = git_service.pull(repo, progress=progress)
+
+    message = [f"Pull réussi. Révision mise à jour : {info.commit.hexsha[:7]}" for info in result['pull_info']]
+    if result['changed_applications']:
+        message.append(f"Applications modifiées : {', '.join(result['changed_applications'])}")
+    return {
+        'message': message,
+        'old_head': result['old_head'],
+        'new_head': result['new_head'],
+        'changed_files': result['changed_files'],
+        'changed_applications': result['changed_applications'],
+        'changed_registries': result['changed_registries'],
+    }
+
+def _push_operation(commit_message, progress):
+    """Push exécuté en arrière-plan."""
+    repo = get_repo()
+    if not repo:
+        raise RuntimeError('Dépôt non trouvé')
+    with metrics.git_operation('push'):
+        commit = git_service.push(repo, commit_message, progress=progress)
+    return {'message': 'Push réussi.', 'commit': commit.hexsha}
+
+def _job_accepted(job, coalesced=False):
+    """Réponse 202 : le job est en file, son état est consultable via status_url."""
+    return jsonify({
+        'job_id': job['id'],
+        'status': job['status'],
+        'coalesced': coalesced,
+        'status_url': url_for('sync.git_job_status', job_id=job['id']),
+    }), 202
+
 # API pour l'opération git pull
 @sync_bp.route('/api/git-pull', methods=['POST'])
 def git_pull():
-    repo = get_repo()
-    if not repo:
+    if not get_repo():
         return jsonify({'error': 'Dépôt non trouvé'}), 404
-        
-    try:
-        origin = repo.remotes.origin
-        pull_info = origin.pull()
-        
-        message = [f"Pull réussi. Révision mise à jour : {info.commit.hexsha[:7]}" for info in pull_info]
-        return jsonify({'message': message})
-    except Exception as e:
-        return jsonify({'error': f"Erreur lors du pull : {e}"}), 500
+
+    # Un pull déjà en attente ou en cours est réutilisé plutôt que relancé
+    job, coalesced = git_jobs.submit('pull', _pull_operation, coalesce=True)
+    return _job_accepted(job, coalesced)
 
 # API pour l'opération git push
 @sync_bp.route('/api/git-push', methods=['POST'])
 def git_push():
-    repo = get_repo()
-    if not repo:
+    if not get_repo():
         return jsonify({'error': 'Dépôt non trouvé'}), 404
         
     commit_message = request.json.get('commit_message')
     if not commit_message:
         return jsonify({'error': 'Message de commit manquant'}), 400
 
-    try:
-        # Ajoute tous les fichiers modifiés/supprimés
-        repo.git.add(all=True)
-        # Commit des changements
-        repo.index.commit(commit_message)
-        # Push vers l'origine
-        origin = repo.remotes.origin
-        push_info = origin.push()
-        
-        return jsonify({'message': 'Push réussi.'})
-    except Exception as e:
-        return jsonify({'error': f"Erreur lors du push : {e}"}), 500
\ No newline at end of file
+    # Les push sont exécutés l'un après l'autre, jamais fusionnés
+    job, _ = git_jobs.submit('push', lambda progress: _push_operation(commit_message, progress))
+    return _job_accepted(job)
+
+# API pour suivre l'avancement d'un job git
+@sync_bp.route('/api/git-jobs/<job_id>', methods=['GET'])
+def git_job_status(job_id):
+    job = git_jobs.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job non trouvé'}), 404
+    return jsonify(job)
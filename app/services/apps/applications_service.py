@@ -1,11 +1,27 @@
-import yaml
+import yaml_io
 import os
-from config import DATA_PATHS
-
-REPO_PATH = os.environ.get('REPO_PATH')
+import copy
+import tempfile
+import threading
+import metrics
+from config import DATA_PATHS, CATALOG_SETTINGS
+from services.apps.catalog import ApplicationCatalog, app_key
+from services.apps import dependency_index, graph_analytics, persistence
+
+REPO_PATH = os.environ.get('REPO_PATH', '')
 # Chemin du répertoire racine des applications
 ROOT_PATH = REPO_PATH+"/"+DATA_PATHS.get('applications_root')
 
+# Catalogue partagé par le processus : chaque fichier n'est relu que s'il a changé
+catalog = ApplicationCatalog(
+    ROOT_PATH,
+    scan_interval=CATALOG_SETTINGS.get('scan_interval', 0),
+    parse_workers=CATALOG_SETTINGS.get('parse_workers', 0),
+    parse_executor=CATALOG_SETTINGS.get('parse_executor', 'process'),
+    parallel_threshold=CATALOG_SETTINGS.get('parallel_threshold', 64),
+    change_counter=persistence.ChangeCounter(os.path.join(persistence.LOCK_DIR, 'catalog.changes')),
+)
+
 def _find_file_path(base, name, namespace):
     """
     Trouve le chemin complet du fichier YAML pour une application.
@@ -19,31 +35,40 @@ def load_data():
     """
     Charge les données de toutes les applications depuis tous les fichiers YAML
     dans la structure de répertoires et les trie par nom.
+    Les fichiers inchangés depuis la dernière lecture sont servis par le catalogue.
+    Les dictionnaires retournés sont partagés et ne doivent pas être modifiés.
     """
-    all_applications = []
-    # ... (le code existant pour charger et trier les données)
-    if not os.path.exists(ROOT_PATH):
-        return []
+    return list(catalog.applications())
 
-    for root, dirs, files in os.walk(ROOT_PATH):
-        for file in files:
-            if file.endswith('.yaml'):
-                filepath = os.path.join(root, file)
-                try:
-                    with open(filepath, 'r') as f:
-                        data = yaml.safe_load(f)
-                        if data and 'apps' in data:
-                            for app_name, app_data in data['apps'].items():
-                                app_data['full_path'] = filepath
-                                all_applications.append(app_data)
-                except (yaml.YAMLError, FileNotFoundError) as e:
-                    print(f"Erreur de lecture du fichier {filepath}: {e}")
-                    continue
-    
-    # Trie la liste des applications par le nom (ordre alphabétique)
-    all_applications.sort(key=lambda app: app.get('name', '').lower())
-    
-    return all_applications
+def iter_applications():
+    """
+    Itère sur les applications triées sans copier la liste : un
+    rafraîchissement ultérieur remplace la liste du catalogue sans
+    modifier celle en cours de parcours.
+    """
+    return iter(catalog.applications())
+
+def query_applications(filters, offset=0, limit=None, fields=None):
+    """
+    Retourne (applications, total) : la page [offset, offset + limit) des
+    applications correspondant aux filtres (voir ApplicationCatalog.query),
+    réduites aux champs 'fields' si fournis. 'total' compte toutes les
+    applications filtrées, avant pagination.
+    """
+    applications = catalog.query(**filters)
+    total = len(applications)
+    page = applications[offset:offset + limit if limit is not None else None]
+    if fields:
+        page = [{field: app[field] for field in fields if field in app} for app in page]
+    return page, total
+
+def data_version():
+    """
+    Version courante du catalogue (après rafraîchissement), incrémentée à
+    chaque changement : sert à réutiliser les réponses déjà sérialisées.
+    """
+    catalog.refresh()
+    return catalog.version
 
 def save_data(data):
     """
@@ -66,17 +91,26 @@ def save_data(data):
         file_path = data['full_path']
         del data['full_path'] # Nettoyer la clé temporaire
 
-      # Charger le fichier existant s'il y en a un
-    full_yaml_data = {}
-    if os.path.exists(file_path):
-        with open(file_path, 'r') as f:
-            full_yaml_data = yaml.safe_load(f) or {}
+    # Lecture-modification-écriture sous verrou inter-processus : aucun autre worker ne s'intercale
+    with persistence.file_lock(file_path):
+        # Charger le fichier existant s'il y en a un
+        full_yaml_data = {}
+        if os.path.exists(file_path):
+            with open(file_path, 'r') as f:
+                full_yaml_data = yaml_io.safe_load(f) or {}
 
-    # S'assurer que la clé 'apps' existe
-    if 'apps' not in full_yaml_data:
-        full_yaml_data['apps'] = {}
+        # S'assurer que la clé 'apps' existe
+        if 'apps' not in full_yaml_data:
+            full_yaml_data['apps'] = {}
+
+        full_yaml_data['apps'][data['name']] = _app_data_to_save(data)
 
-    # Mettre à jour l'application spécifique
+        # Écriture atomique (le répertoire est créé si nécessaire)
+        persistence.atomic_write(file_path, yaml_io.dump(full_yaml_data, sort_keys=False), service='applications')
+        catalog.invalidate(file_path)
+
+def _app_data_to_save(data):
+    """Construit l'entrée YAML d'une application, dans l'ordre des clés du fichier."""
     app_data_to_save = {
         'active': data.get('active', False),
         'name': data.get('name'),
@@ -101,14 +135,7 @@ def save_data(data):
         if not app_data_to_save['ingress']['annotations']:
             del app_data_to_save['ingress']['annotations']
     # Supprimer les clés avec des valeurs 'None' pour un YAML plus propre
-    app_data_to_save = {k: v for k, v in app_data_to_save.items() if v is not None}
-    
-    full_yaml_data['apps'][data['name']] = app_data_to_save
-
-    # Créer le répertoire si nécessaire
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w') as f:
-        yaml.dump(full_yaml_data, f, sort_keys=False)
+    return {k: v for k, v in app_data_to_save.items() if v is not None}
 
 def create_application(new_app_data):
     """
@@ -120,12 +147,14 @@ def create_application(new_app_data):
     if not name or not namespace:
         raise ValueError("Le nom et le namespace sont requis pour la création d'une application.")
 
-    # Vérifier l'unicité
-    all_apps = load_data()
-    if any(app['name'] == name and app['namespace'] == namespace for app in all_apps):
-        return None # Application existante
-   
-    save_data(new_app_data)
+    file_path = _find_file_path(new_app_data.get('base'), name, namespace)
+    # Vérification et écriture sous le verrou du fichier cible, relu : il a pu être écrit par un autre worker
+    with persistence.file_lock(file_path):
+        catalog.invalidate(file_path)
+        if catalog.exists(name, namespace):
+            return None # Application existante
+
+        save_data(new_app_data)
     return new_app_data
 
 def update_application(current_base, current_name, current_namespace, updated_data):
@@ -134,8 +163,7 @@ def update_application(current_base, current_name, current_namespace, updated_da
     Si le nom ou le namespace est modifié, le fichier sera déplacé.
     """
     # Rechercher l'application existante
-    all_apps = load_data()
-    app_to_update = next((app for app in all_apps if app['name'] == current_name and app['namespace'] == current_namespace), None)
+    app_to_update = catalog.get(current_name, current_namespace)
     
     if not app_to_update:
         return None
@@ -143,29 +171,50 @@ def update_application(current_base, current_name, current_namespace, updated_da
     # Gérer un éventuel changement de nom ou de namespace
     new_name = updated_data.get('name', current_name)
     new_namespace = updated_data.get('namespace', current_namespace)
-
-    # Vérifier si l'entité de destination existe déjà
-    if (new_name != current_name or new_namespace != current_namespace) and \
-       any(app['name'] == new_name and app['namespace'] == new_namespace for app in all_apps):
-        return None # Conflit d'identifiant
-
-    # Gérer la mise à jour des données
-    for key, value in updated_data.items():
-        app_to_update[key] = value
-
-    # Sauvegarder les données
-    save_data(app_to_update)
-
-    # Si le nom ou le namespace a changé, il faut supprimer l'ancien fichier
-    if new_name != current_name or new_namespace != current_namespace:
-        old_file_path = _find_file_path(current_base, current_name, current_namespace)
-        if os.path.exists(old_file_path):
-            os.remove(old_file_path)
-            # On peut aussi tenter de supprimer le répertoire si il est vide
-            try:
-                os.rmdir(os.path.dirname(old_file_path))
-            except OSError:
-                pass # Le répertoire n'était pas vide, on ne le supprime pas
+    renamed = new_name != current_name or new_namespace != current_namespace
+
+    # Fichiers source et cible verrouillés jusqu'à la fin de l'écriture : la
+    # lecture-modification-écriture ne peut pas perdre celle d'un autre worker
+    paths = [app_to_update.get('full_path') or _find_file_path(current_base, current_name, current_namespace)]
+    if renamed:
+        paths.append(_find_file_path(current_base, current_name, current_namespace))
+        paths.append(_find_file_path(updated_data.get('base', app_to_update.get('base')), new_name, new_namespace))
+    with persistence.file_locks(paths):
+        # Relecture sous verrou : l'application a pu être modifiée par un autre worker
+        for file_path in paths:
+            catalog.invalidate(file_path)
+        app_to_update = catalog.get(current_name, current_namespace)
+        if not app_to_update:
+            return None
+        # Copie de travail : l'entrée du catalogue ne doit pas être modifiée en place
+        app_to_update = copy.deepcopy(app_to_update)
+
+        # Vérifier si l'entité de destination existe déjà
+        if renamed and catalog.exists(new_name, new_namespace):
+            return None # Conflit d'identifiant
+
+        # Gérer la mise à jour des données
+        for key, value in updated_data.items():
+            app_to_update[key] = value
+
+        # En cas de renommage, l'application est écrite dans le fichier de sa nouvelle clé
+        if renamed:
+            app_to_update.pop('full_path', None)
+
+        # Sauvegarder les données
+        save_data(app_to_update)
+
+        # Si le nom ou le namespace a changé, il faut supprimer l'ancien fichier
+        if renamed:
+            old_file_path = _find_file_path(current_base, current_name, current_namespace)
+            if os.path.exists(old_file_path):
+                os.remove(old_file_path)
+                catalog.invalidate(old_file_path)
+                # On peut aussi tenter de supprimer le répertoire si il est vide
+                try:
+                    os.rmdir(os.path.dirname(old_file_path))
+                except OSError:
+                    pass # Le répertoire n'était pas vide, on ne le supprime pas
 
     return app_to_update
 
@@ -175,89 +224,277 @@ def delete_application(base, name, namespace):
     """
     file_path = _find_file_path(base, name, namespace)
 
-    if not os.path.exists(file_path):
-        return False
+    # Lecture-modification-écriture sous verrou inter-processus, comme save_data
+    with persistence.file_lock(file_path):
+        if not os.path.exists(file_path):
+            return False
+
+        with open(file_path, 'r') as f:
+            full_yaml_data = yaml_io.safe_load(f) or {}
+
+        if 'apps' in full_yaml_data and name in full_yaml_data['apps']:
+            del full_yaml_data['apps'][name]
+
+            persistence.atomic_write(file_path, yaml_io.dump(full_yaml_data, sort_keys=False), service='applications')
+
+            # Si le fichier est vide, on le supprime
+            if not full_yaml_data.get('apps'):
+                os.remove(file_path)
+                try:
+                    os.rmdir(os.path.dirname(file_path))
+                except OSError:
+                    pass
+
+            catalog.invalidate(file_path)
+            return True
+        return 
+
+# Sérialise les lots d'écritures du processus ; entre processus, chaque fichier touché est verrouillé
+_batch_lock = threading.Lock()
+# Nouvelles planifications si un autre worker modifie les fichiers du lot pendant sa préparation
+BATCH_RETRIES = 3
+
+def _plan_create(apps, data):
+    name = data.get('name')
+    namespace = data.get('namespace')
+    base = data.get('base')
+    if not name or not namespace or not base:
+        raise ValueError("Le namespace, la base et le nom sont requis pour la création d'une application.")
+    if (name, namespace) in apps:
+        raise ValueError("Une application avec ce nom et ce namespace existe déjà.")
+    new_app = copy.deepcopy(data)
+    file_path = _find_file_path(base, name, namespace)
+    apps[(name, namespace)] = dict(new_app, full_path=file_path)
+    return [(file_path, name, new_app)], new_app
+
+def _plan_update(apps, base, name, namespace, data):
+    current = apps.get((name, namespace))
+    if current is None:
+        raise ValueError("Application introuvable.")
+    new_name = data.get('name', name)
+    new_namespace = data.get('namespace', namespace)
+    renamed = new_name != name or new_namespace != namespace
+    if renamed and (new_name, new_namespace) in apps:
+        raise ValueError("Une application avec ce nom et ce namespace existe déjà.")
+
+    updated = copy.deepcopy(current)
+    updated.update(copy.deepcopy(data))
+    file_path = updated.pop('full_path', None)
+    changes = []
+    if renamed:
+        # Comme update_application : l'application rejoint le fichier de sa nouvelle clé
+        del apps[(name, namespace)]
+        changes.append((file_path or _find_file_path(base, name, namespace), name, None))
+        file_path = _find_file_path(updated.get('base'), new_name, new_namespace)
+    elif file_path is None:
+        file_path = _find_file_path(updated.get('base'), new_name, new_namespace)
+    apps[(new_name, new_namespace)] = dict(updated, full_path=file_path)
+    changes.append((file_path, new_name, updated))
+    return changes, updated
+
+def _plan_delete(apps, base, name, namespace):
+    current = apps.pop((name, namespace), None)
+    if current is None:
+        raise ValueError("Application introuvable.")
+    # Suppression dans le fichier réel de l'application, même si 'base' ne lui correspond pas
+    return [(current.get('full_path') or _find_file_path(base, name, namespace), name, None)], None
+
+def _plan_operation(apps, operation):
+    """Valide une opération contre l'état 'apps' (modifié en place) et retourne (changements, résultat)."""
+    if not isinstance(operation, dict):
+        raise ValueError("Chaque opération doit être un objet.")
+    op = operation.get('op')
+    data = operation.get('data') or {}
+    if not isinstance(data, dict):
+        raise ValueError("Le champ 'data' doit être un objet.")
+    # Le fichier de destination est déterminé par le service, jamais par le client
+    data = {key: value for key, value in data.items() if key != 'full_path'}
+    if op == 'create':
+        return _plan_create(apps, data)
+    identity = (operation.get('base'), operation.get('name'), operation.get('namespace'))
+    if op in ('update', 'delete') and not all(identity):
+        raise ValueError("La base, le nom et le namespace de l'application sont requis.")
+    if op == 'update':
+        return _plan_update(apps, *identity, data)
+    if op == 'delete':
+        return _plan_delete(apps, *identity)
+    raise ValueError("Opération inconnue : 'create', 'update' ou 'delete' attendu.")
+
+def _render_file(file_path, changes):
+    """
+    Applique les changements [(nom, application ou None)] au contenu actuel
+    du fichier. Retourne le YAML à écrire, ou None si le fichier devient vide.
+    """
+    full_yaml_data = {}
+    if os.path.exists(file_path):
+        with open(file_path, 'r') as f:
+            full_yaml_data = yaml_io.safe_load(f) or {}
+    if 'apps' not in full_yaml_data or full_yaml_data['apps'] is None:
+        full_yaml_data['apps'] = {}
+    for name, app in changes:
+        if app is None:
+            full_yaml_data['apps'].pop(name, None)
+        else:
+            full_yaml_data['apps'][name] = _app_data_to_save(app)
+    if not full_yaml_data['apps']:
+        return None
+    return yaml_io.dump(full_yaml_data, sort_keys=False)
 
-    with open(file_path, 'r') as f:
-        full_yaml_data = yaml.safe_load(f) or {}
+def _write_files(contents):
+    """
+    Écrit chaque fichier {chemin: YAML ou None (suppression)} en une fois.
+    Les nouveaux contenus sont d'abord écrits dans des fichiers temporaires,
+    puis mis en place par renommage ; en cas d'échec, les fichiers déjà
+    remplacés retrouvent leur contenu d'origine.
+    """
+    originals = {}
+    staged = {}
+    try:
+        for file_path, text in contents.items():
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    originals[file_path] = f.read()
+            if text is not None:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.batch-', suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    f.write(text)
+                staged[file_path] = tmp_path
+
+        done = []
+        try:
+            for file_path, text in contents.items():
+                if text is not None:
+                    os.replace(staged[file_path], file_path)
+                    # Retiré après coup : un renommage échoué laisse le temporaire à supprimer
+                    del staged[file_path]
+                    done.append(file_path)
+                elif file_path in originals:
+                    os.remove(file_path)
+                    done.append(file_path)
+                    try:
+                        os.rmdir(os.path.dirname(file_path))
+                    except OSError:
+                        pass
+        except OSError:
+            for file_path in done:
+                if file_path in originals:
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                    with open(file_path, 'w') as f:
+                        f.write(originals[file_path])
+                else:
+                    os.remove(file_path)
+            raise
+
+        # Les octets ne sont comptés qu'une fois le lot entièrement en place
+        for text in contents.values():
+            if text is not None:
+                metrics.record_write('applications', text)
+    finally:
+        for tmp_path in staged.values():
+            os.remove(tmp_path)
+        for file_path in contents:
+            catalog.invalidate(file_path)
+
+def apply_batch(operations, dry_run=False):
+    """
+    Applique un lot d'opérations sur les applications, en tout ou rien.
 
-    if 'apps' in full_yaml_data and name in full_yaml_data['apps']:
-        del full_yaml_data['apps'][name]
+    Chaque opération est un objet {'op': 'create', 'data': {...}},
+    {'op': 'update', 'base', 'name', 'namespace', 'data': {...}} ou
+    {'op': 'delete', 'base', 'name', 'namespace'}. Les opérations sont
+    validées dans l'ordre contre un même état du catalogue (une opération
+    voit l'effet des précédentes), puis regroupées par fichier de
+    destination : chaque fichier est lu et écrit une seule fois.
 
-        with open(file_path, 'w') as f:
-            yaml.dump(full_yaml_data, f, sort_keys=False)
+    Retourne (appliqué, résultats) avec un statut par opération. Avec
+    dry_run, le lot est seulement validé : rien n'est écrit.
 
-        # Si le fichier est vide, on le supprime
-        if not full_yaml_data.get('apps'):
-            os.remove(file_path)
-            try:
-                os.rmdir(os.path.dirname(file_path))
-            except OSError:
-                pass
+    Les fichiers touchés sont verrouillés (flock) pendant l'écriture ; le lot
+    est alors revalidé contre leur contenu relu sous verrou, pour ne perdre
+    aucune écriture d'un autre worker.
+    """
+    with _batch_lock:
+        applied, results, files = _plan_batch(operations)
+        if not applied or dry_run:
+            return applied, results
+
+        for _ in range(BATCH_RETRIES):
+            with persistence.file_locks(files):
+                for file_path in files:
+                    catalog.invalidate(file_path)
+                applied, results, planned = _plan_batch(operations)
+                if not applied:
+                    return False, results
+                if planned.keys() <= files.keys():
+                    _write_files({file_path: _render_file(file_path, changes) for file_path, changes in planned.items()})
+                    return True, results
+            # Le lot touche désormais d'autres fichiers : ils sont verrouillés à leur tour
+            files = dict(files, **planned)
+        raise persistence.ConflictError("Les fichiers du lot ont été modifiés pendant sa préparation")
+
+def _plan_batch(operations):
+    """
+    Valide les opérations contre le catalogue courant ; retourne (valide,
+    résultats, {chemin: [(nom, application ou None)]}).
+    """
+    apps = catalog.by_key()
+    results = []
+    files = {}  # chemin -> [(nom, application ou None)], dans l'ordre des opérations
+    failed = False
+    for index, operation in enumerate(operations):
+        try:
+            changes, app = _plan_operation(apps, operation)
+        except ValueError as e:
+            failed = True
+            results.append({'index': index, 'status': 'error', 'error': str(e)})
+            continue
+        for file_path, name, data in changes:
+            files.setdefault(file_path, []).append((name, data))
+        results.append({'index': index, 'status': 'ok', 'application': app})
 
-        return True
-    return 
+    if failed:
+        for result in results:
+            if result['status'] == 'ok':
+                result['status'] = 'not_applied'
+                del result['application']
+    return not failed, results, files
 
 def get_application(name, namespace):
     """
-    Récupère les données complètes d'une seule application en chargeant l'ensemble
-    des applications et en filtrant par nom et namespace.
+    Récupère les données complètes d'une seule application via l'index
+    (name, namespace) du catalogue.
     """
-    # Charge toutes les applications
-    all_applications = load_data()
-    
-    # Recherche et retourne la première application qui correspond au nom et au namespace
-    for app in all_applications:
-        if app.get('name') == name and app.get('namespace') == namespace:
-            return app
-            
-    return None
+    return catalog.get(name, namespace)
 
 
-def get_dependency_tree(app_name, app_namespace, depth):
-    all_apps = load_data()
-    apps_dict = {f"{app.get('name')}:{app.get('namespace')}": app for app in all_apps}
-    
-    nodes = []
-    links = []
-    processed_ids = set()
-    
-    # Utilisez une file d'attente pour la recherche en largeur (BFS)
-    # Le type est initialisé pour le nœud source
-    queue = [(f"{app_name}:{app_namespace}", 0, 'source')]
+def get_dependency_tree(app_name, app_namespace, depth, direction=dependency_index.DEPENDENCIES):
+    """
+    Construit le graphe des dépendances d'une application jusqu'à 'depth' niveaux
+    (float('inf') pour tout le graphe). 'direction' vaut 'dependencies' (ce dont
+    l'application a besoin), 'dependents' (ce qui casse si elle tombe) ou 'both'.
+    L'index d'adjacence est construit une seule fois par version du catalogue.
+    """
+    index = dependency_index.get_index(catalog)
+    return index.tree(app_name, app_namespace, depth, direction)
 
-    while queue:
-        current_id, current_depth, node_type = queue.pop(0)
 
-        if current_id in processed_ids or current_depth > depth:
-            continue
-        
-        processed_ids.add(current_id)
-        current_app = apps_dict.get(current_id)
+def get_dependency_cycles():
+    """
+    Retourne les cycles de dépendances (composantes fortement connexes),
+    chacun sous forme de liste d'identifiants 'name:namespace'.
+    """
+    return graph_analytics.get_analytics(catalog).cycles()
 
-        if current_app:
-            nodes.append({
-                'id': current_id,
-                'name': current_app.get('name'),
-                'namespace': current_app.get('namespace'),
-                'level': current_depth,
-                'type': node_type
-            })
-            
-            # Rechercher les dépendances (celles dont l'app dépend)
-            if current_depth < depth:
-                for dep in current_app.get('dependsOn', []):
-                    dep_id = f"{dep.get('name')}:{dep.get('namespace')}"
-                    links.append({
-                        'source': dep_id, 
-                        'target': current_id, 
-                        'type': 'dependency'
-                    })
-                    queue.append((dep_id, current_depth + 1, 'dependency'))
-
-    # ✅ La boucle qui recherchait les dépendants a été retirée.
-    
-    return {'nodes': nodes, 'links': links}
+
+def get_topological_order():
+    """Retourne les applications dans l'ordre de déploiement (dépendances d'abord)."""
+    return graph_analytics.get_analytics(catalog).topological_order()
+
+
+def is_upstream(upstream_id, downstream_id):
+    """Vrai si 'downstream_id' dépend, directement ou non, de 'upstream_id' (ids 'name:namespace')."""
+    return graph_analytics.get_analytics(catalog).is_upstream(upstream_id, downstream_id)
 
 
 def get_all_dependencies_graph_data():
@@ -265,7 +502,7 @@ def get_all_dependencies_graph_data():
     Construit un graphe de toutes les dépendances entre toutes les applications.
     """
     all_apps = load_data()
-    apps_dict = {f"{app.get('name')}:{app.get('namespace')}": app for app in all_apps}
+    apps_dict = catalog.by_key()
     
     nodes = []
     links = []
@@ -274,7 +511,11 @@ def get_all_dependencies_graph_data():
     added_node_ids = set()
 
     # Parcourir toutes les applications pour construire les nœuds et les liens
-    for app_id, app in apps_dict.items():
+    for app in all_apps:
+        # Une seule entrée par couple (name, namespace), comme l'index du catalogue
+        if apps_dict.get(app_key(app)) is not app:
+            continue
+        app_id = f"{app.get('name')}:{app.get('namespace')}"
         if app_id not in added_node_ids:
             nodes.append({
                 'id': app_id,
@@ -0,0 +1,50 @@
+import threading
+
+import metrics
+from services.apps import applications_service, components_service, substitutes_service, ingress_annotations_service
+
+# Dernier bundle construit : (version, bundle)
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def bundle_version():
+    """
+    Version du bundle : versions du catalogue et des trois registres, ou
+    None si l'un des registres est illisible (rien n'est alors mis en cache).
+    """
+    versions = (
+        applications_service.data_version(),
+        components_service.data_version(),
+        substitutes_service.data_version(),
+        ingress_annotations_service.data_version(),
+    )
+    return None if None in versions else versions
+
+
+def get_bundle(version=None):
+    """
+    Retourne les données d'amorçage de la page des applications
+    (applications, components, substitutes, annotations d'ingress),
+    reconstruites uniquement lorsque l'une des sources a changé.
+    Le bundle est partagé : il ne doit pas être modifié.
+    """
+    global _cache
+    if version is None:
+        version = bundle_version()
+    with _cache_lock:
+        if version is not None and _cache is not None and _cache[0] == version:
+            metrics.cache_result('bootstrap', True)
+            return _cache[1]
+    metrics.cache_result('bootstrap', False)
+
+    bundle = {
+        'applications': applications_service.load_data(),
+        'components': components_service.load_data(),
+        'substitutes': substitutes_service.load_data(),
+        'ingress_annotations': ingress_annotations_service.load_data(),
+    }
+    if version is not None:
+        with _cache_lock:
+            _cache = (version, bundle)
+    return bundle
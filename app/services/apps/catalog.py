@@ -0,0 +1,650 @@
+import atexit
+import bisect
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import yaml
+import metrics
+import yaml_io
+from services.apps import persistence
+
+
+def _fork_safe(lock):
+    """
+    Prend le verrou pendant os.fork() (workers gunicorn créés par un maître
+    préchargé) : un thread du maître ne peut pas le laisser pris dans l'enfant.
+    """
+    os.register_at_fork(before=lock.acquire, after_in_parent=lock.release, after_in_child=lock.release)
+    return lock
+
+
+def _fingerprint(filepath):
+    """Retourne l'empreinte (mtime, taille) d'un fichier, ou None s'il n'existe plus."""
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _parse_file(filepath):
+    """
+    Lit un fichier YAML d'applications et retourne le couple (applications, erreur).
+    Chaque application est annotée de son 'full_path' ; en cas de fichier
+    illisible, applications vaut None et erreur contient le message.
+    Fonction de niveau module pour pouvoir être exécutée dans un pool de processus.
+    """
+    applications = []
+    try:
+        with open(filepath, 'r') as f:
+            data = yaml_io.safe_load(f)
+            if data and 'apps' in data:
+                for app_name, app_data in data['apps'].items():
+                    app_data['full_path'] = filepath
+                    applications.append(app_data)
+    except (yaml.YAMLError, FileNotFoundError) as e:
+        return None, str(e)
+    return applications, None
+
+
+def app_key(app):
+    """Clé d'identification d'une application : le couple (name, namespace)."""
+    return (app.get('name'), app.get('namespace'))
+
+
+def component_names(app):
+    """Noms des components référencés par une application ({path: ...} ou {nom: ...})."""
+    names = []
+    for component in app.get('components') or []:
+        if isinstance(component, dict):
+            component = component.get('path') or component.get('nom')
+        if component:
+            names.append(component)
+    return names
+
+
+def substitute_keys(app):
+    """Clés des substitutes utilisées par une application ({key: ..., value: ...})."""
+    keys = []
+    for substitute in app.get('substitute') or []:
+        if isinstance(substitute, dict):
+            substitute = substitute.get('key')
+        if substitute:
+            keys.append(substitute)
+    return keys
+
+
+def annotation_names(app):
+    """Noms des annotations d'ingress utilisées par une application (clés de ingress.annotations)."""
+    ingress = app.get('ingress')
+    if not isinstance(ingress, dict) or not isinstance(ingress.get('annotations'), dict):
+        return []
+    return list(ingress['annotations'])
+
+
+class ApplicationCatalog:
+    """
+    Catalogue en mémoire des applications, partagé au niveau du processus.
+
+    Chaque fichier YAML est analysé une seule fois et conservé avec son
+    empreinte (mtime, taille). Un rafraîchissement parcourt l'arborescence
+    et ne relit que les fichiers modifiés, ajoutés ou supprimés.
+
+    Le catalogue maintient un index par clé (name, namespace) ainsi que des
+    index secondaires (namespace, base, component, substitute, annotation
+    d'ingress), mis à jour fichier par fichier, qui servent les requêtes
+    filtrées sans parcourir toutes les applications.
+
+    Lorsque 'parse_workers' est positif et qu'au moins 'parallel_threshold'
+    fichiers sont à relire (démarrage à froid, gros git pull), l'analyse est
+    répartie sur un pool de processus ('process') ou de threads ('thread').
+    """
+
+    def __init__(self, root_path, scan_interval=0, parse_workers=0, parse_executor='process', parallel_threshold=64,
+                 change_counter=None):
+        self.root_path = root_path
+        # Délai minimal (en secondes) entre deux parcours de l'arborescence
+        self.scan_interval = scan_interval
+        # persistence.ChangeCounter partagé par les workers : incrémenté à chaque
+        # fichier modifié par l'un d'eux, il force un parcours dans les autres
+        self.change_counter = change_counter
+        self._seen_changes = None
+        self.parse_workers = parse_workers
+        self.parse_executor = parse_executor
+        self.parallel_threshold = parallel_threshold
+        # Vrai lorsqu'un CatalogWatcher pousse les changements : les lectures ne parcourent plus l'arborescence
+        self.watched = False
+        # Incrémenté à chaque modification effective du contenu du catalogue
+        self.version = 0
+        self._files = {}  # chemin -> (empreinte, [applications]), dans l'ordre d'os.walk
+        self._by_key = {}  # (name, namespace) -> application retenue parmi les homonymes
+        self._copies = {}  # (name, namespace) -> [(chemin, application)], homonymes compris
+        self._count = 0  # nombre d'applications de tous les fichiers, homonymes compris
+        self._by_namespace = {}  # namespace -> {(name, namespace): application}
+        self._by_base = {}  # base -> {(name, namespace): application}
+        self._by_component = {}  # component -> {(name, namespace): application}
+        self._by_substitute = {}  # clé de substitute -> {(name, namespace): application}
+        self._by_annotation = {}  # annotation d'ingress -> {(name, namespace): application}
+        self._applications = []
+        self._sort_keys = []  # noms en minuscules, alignés sur _applications (recherche par préfixe)
+        self._rank = {}  # id(application) -> position dans _applications
+        self._sorted = True
+        self._last_scan = None
+        self._lock = _fork_safe(threading.RLock())
+
+    def _scan(self):
+        """Liste les fichiers YAML de l'arborescence dans l'ordre d'os.walk."""
+        paths = []
+        if not os.path.exists(self.root_path):
+            return paths
+        for root, dirs, files in os.walk(self.root_path):
+            for file in files:
+                if file.endswith('.yaml'):
+                    paths.append(os.path.join(root, file))
+        return paths
+
+    def _secondary_entries(self, app):
+        """Couples (index secondaire, valeur) sous lesquels une application est indexée."""
+        entries = [(self._by_namespace, app.get('namespace')), (self._by_base, app.get('base'))]
+        entries += [(self._by_component, name) for name in component_names(app)]
+        entries += [(self._by_substitute, key) for key in substitute_keys(app)]
+        entries += [(self._by_annotation, name) for name in annotation_names(app)]
+        return entries
+
+    def _resolve(self, key, order=None):
+        """
+        Indexe l'application retenue pour 'key' : parmi des homonymes
+        (même name et namespace dans plusieurs fichiers), la première dans
+        l'ordre d'os.walk, comme la première correspondance de la liste triée.
+        """
+        copies = self._copies.get(key)
+        if not copies:
+            winner = None
+        elif len(copies) == 1:
+            winner = copies[0][1]
+        else:
+            if order is None:
+                order = {filepath: position for position, filepath in enumerate(self._files)}
+
+            def position(copy):
+                filepath, app = copy
+                in_file = next(i for i, other in enumerate(self._files[filepath][1]) if other is app)
+                return order[filepath], in_file
+            winner = min(copies, key=position)[1]
+        current = self._by_key.get(key)
+        if current is winner:
+            return
+        if current is not None:
+            for index, value in self._secondary_entries(current):
+                bucket = index.get(value)
+                if bucket is not None and bucket.get(key) is current:
+                    del bucket[key]
+                    if not bucket:
+                        del index[value]
+        if winner is None:
+            del self._by_key[key]
+            return
+        self._by_key[key] = winner
+        for index, value in self._secondary_entries(winner):
+            index.setdefault(value, {})[key] = winner
+
+    def _index(self, filepath, applications):
+        keys = set()
+        for app in applications:
+            key = app_key(app)
+            self._copies.setdefault(key, []).append((filepath, app))
+            keys.add(key)
+        for key in keys:
+            self._resolve(key)
+
+    def _unindex(self, filepath, applications):
+        keys = set()
+        for app in applications:
+            key = app_key(app)
+            copies = [copy for copy in self._copies.get(key, []) if copy[1] is not app]
+            if copies:
+                self._copies[key] = copies
+            else:
+                self._copies.pop(key, None)
+            keys.add(key)
+        # Un homonyme restant dans un autre fichier reprend la place de l'application retirée
+        for key in keys:
+            self._resolve(key)
+
+    def _set_file(self, filepath, fingerprint, applications):
+        previous = self._files.get(filepath)
+        self._files[filepath] = (fingerprint, applications)
+        if previous:
+            self._count -= len(previous[1])
+            self._unindex(filepath, previous[1])
+        self._count += len(applications)
+        self._index(filepath, applications)
+        self._changed()
+
+    def _drop_file(self, filepath):
+        previous = self._files.pop(filepath, None)
+        if previous:
+            self._count -= len(previous[1])
+            self._unindex(filepath, previous[1])
+            self._changed()
+
+    def _parse_many(self, paths):
+        """Analyse une liste de fichiers, en parallèle si la configuration le permet."""
+        if self.parse_workers <= 0 or len(paths) < self.parallel_threshold:
+            return [_parse_file(filepath) for filepath in paths]
+        executor_class = ThreadPoolExecutor if self.parse_executor == 'thread' else ProcessPoolExecutor
+        chunksize = max(1, len(paths) // (self.parse_workers * 4))
+        with executor_class(max_workers=self.parse_workers) as executor:
+            # map() conserve l'ordre des chemins fournis
+            return list(executor.map(_parse_file, paths, chunksize=chunksize))
+
+    def _load_files(self, stale):
+        """Relit les fichiers [(chemin, empreinte)] et met à jour les index."""
+        if not stale:
+            return
+        start = time.perf_counter()
+        results = self._parse_many([filepath for filepath, _ in stale])
+        metrics.YAML_PARSE_SECONDS.labels('applications').inc(time.perf_counter() - start)
+        metrics.YAML_FILES_PARSED.labels('applications').inc(len(stale))
+        for (filepath, fingerprint), (applications, error) in zip(stale, results):
+            if error is not None:
+                metrics.YAML_PARSE_ERRORS.labels('applications').inc()
+                print(f"Erreur de lecture du fichier {filepath}: {error}")
+            # Un fichier invalide est mémorisé vide : il ne sera relu qu'une fois modifié
+            self._set_file(filepath, fingerprint, applications or [])
+
+    def _changed(self):
+        self._sorted = False
+        self.version += 1
+        # Tenu à jour à chaque changement, sans attendre une lecture de la liste triée
+        metrics.CATALOG_APPLICATIONS.set(self._count)
+
+    def refresh(self, force=False):
+        """
+        Synchronise le catalogue avec le disque, au plus une fois par
+        'scan_interval' secondes (jamais si un watcher est actif) sauf si
+        'force' est vrai ou si un autre processus a signalé une modification.
+        Retourne True si au moins un fichier a été relu ou retiré.
+        """
+        with self._lock:
+            now = time.monotonic()
+            changes = self.change_counter.value() if self.change_counter is not None else None
+            if not force and changes == self._seen_changes and self._last_scan is not None and \
+                    (self.watched or now - self._last_scan < self.scan_interval):
+                return False
+            self._last_scan = now
+            self._seen_changes = changes
+
+            paths = self._scan()
+            version = self.version
+            seen = set(paths)
+            for filepath in list(self._files):
+                if filepath not in seen:
+                    self._drop_file(filepath)
+            stale = []
+            for filepath in paths:
+                fingerprint = _fingerprint(filepath)
+                if fingerprint is None:
+                    self._drop_file(filepath)
+                    continue
+                entry = self._files.get(filepath)
+                if entry is None or entry[0] != fingerprint:
+                    stale.append((filepath, fingerprint))
+            self._load_files(stale)
+            if list(self._files) != paths:
+                # Conserve l'ordre d'os.walk pour un tri stable entre homonymes
+                self._files = {filepath: self._files[filepath] for filepath in paths if filepath in self._files}
+                self._sorted = False
+                order = {filepath: position for position, filepath in enumerate(self._files)}
+                for key, copies in self._copies.items():
+                    if len(copies) > 1:
+                        self._resolve(key, order)
+            return self.version != version
+
+    def invalidate(self, filepath):
+        """
+        Relit immédiatement un fichier après une écriture du service
+        (ou le retire du catalogue s'il a été supprimé).
+        """
+        with self._lock:
+            fingerprint = _fingerprint(filepath)
+            entry = self._files.get(filepath)
+            if fingerprint is None:
+                self._drop_file(filepath)
+            else:
+                self._load_files([(filepath, fingerprint)])
+            if (entry[0] if entry else None) != fingerprint:
+                self._signal_change()
+
+    def _signal_change(self):
+        """Signale aux autres processus qu'un fichier a changé sur le disque."""
+        if self.change_counter is None:
+            return
+        changes = self.change_counter.bump()
+        # Ce processus est déjà à jour, sauf si un autre a écrit entre-temps
+        if self._seen_changes == changes - 1:
+            self._seen_changes = changes
+
+    def apply_changes(self, paths):
+        """
+        Relit uniquement les fichiers indiqués (ajoutés, modifiés ou supprimés),
+        sans parcourir l'arborescence. Les chemins hors du répertoire des
+        applications sont ignorés.
+        Retourne les identifiants 'name:namespace' des applications touchées.
+        """
+        root = os.path.join(self.root_path, '')
+        changed = set()
+        with self._lock:
+            for filepath in paths:
+                if not (filepath.startswith(root) and filepath.endswith('.yaml')):
+                    continue
+                before = {app_key(app): app for app in self._files.get(filepath, (None, []))[1]}
+                self.invalidate(filepath)
+                after = {app_key(app): app for app in self._files.get(filepath, (None, []))[1]}
+                changed.update(key for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+        return sorted(f"{name}:{namespace}" for name, namespace in changed)
+
+    def export_files(self):
+        """Retourne l'état analysé {chemin: (empreinte, [applications])}, pour un snapshot."""
+        with self._lock:
+            return dict(self._files)
+
+    def restore_files(self, files):
+        """
+        Amorce le catalogue avec un état issu d'un snapshot. Les empreintes
+        sont revalidées au prochain rafraîchissement : seuls les fichiers
+        modifiés depuis seront relus.
+        """
+        with self._lock:
+            for filepath, (fingerprint, applications) in files.items():
+                self._set_file(filepath, fingerprint, applications)
+
+    def applications(self):
+        """
+        Retourne la liste triée des applications, après rafraîchissement.
+        Les dictionnaires sont partagés : ils ne doivent pas être modifiés.
+        """
+        with self._lock:
+            self.refresh()
+            self._sort()
+            return self._applications
+
+    def _sort(self):
+        if not self._sorted:
+            applications = [app for entry in self._files.values() for app in entry[1]]
+            # Trie la liste des applications par le nom (ordre alphabétique)
+            applications.sort(key=lambda app: app.get('name', '').lower())
+            self._applications = applications
+            self._sort_keys = [app.get('name', '').lower() for app in applications]
+            self._rank = {id(app): position for position, app in enumerate(applications)}
+            self._sorted = True
+
+    def query(self, namespace=None, base=None, component=None, substitute=None, active=None, name_prefix=None):
+        """
+        Retourne les applications correspondant à tous les critères fournis,
+        dans l'ordre de applications(). Les critères indexés sont résolus par
+        intersection des index, le préfixe de nom par recherche dichotomique ;
+        seul 'active' est évalué application par application.
+        """
+        with self._lock:
+            self.refresh()
+            self._sort()
+            applications = self._applications
+            start, stop = 0, len(applications)
+            if name_prefix:
+                prefix = name_prefix.lower()
+                start = bisect.bisect_left(self._sort_keys, prefix)
+                # '\U0010ffff' est supérieur à tout caractère : borne haute des noms préfixés
+                stop = bisect.bisect_right(self._sort_keys, prefix + '\U0010ffff', lo=start)
+
+            buckets = [
+                index.get(value, {})
+                for index, value in (
+                    (self._by_namespace, namespace),
+                    (self._by_base, base),
+                    (self._by_component, component),
+                    (self._by_substitute, substitute),
+                )
+                if value is not None
+            ]
+            if buckets:
+                buckets.sort(key=len)
+                candidates = [app for key, app in buckets[0].items() if all(key in bucket for bucket in buckets[1:])]
+                rank = self._rank
+                candidates = sorted(
+                    (app for app in candidates if start <= rank[id(app)] < stop),
+                    key=lambda app: rank[id(app)],
+                )
+            else:
+                candidates = applications[start:stop]
+
+            if active is not None:
+                candidates = [app for app in candidates if bool(app.get('active')) == active]
+            return candidates
+
+    def get(self, name, namespace):
+        """Retourne l'application (name, namespace) ou None, sans parcourir le catalogue."""
+        with self._lock:
+            self.refresh()
+            return self._by_key.get((name, namespace))
+
+    def exists(self, name, namespace):
+        return self.get(name, namespace) is not None
+
+    def size(self):
+        """Nombre d'applications en mémoire, sans rafraîchissement."""
+        return len(self._by_key)
+
+    def by_key(self):
+        """
+        Retourne une copie de l'index (name, namespace) -> application, prise
+        sous le verrou : elle peut être parcourue pendant un rafraîchissement.
+        Les applications sont partagées et ne doivent pas être modifiées.
+        """
+        with self._lock:
+            self.refresh()
+            return dict(self._by_key)
+
+    def by_namespace(self, namespace):
+        """Retourne les applications d'un namespace."""
+        with self._lock:
+            self.refresh()
+            return list(self._by_namespace.get(namespace, {}).values())
+
+    def by_base(self, base):
+        """Retourne les applications d'une base."""
+        with self._lock:
+            self.refresh()
+            return list(self._by_base.get(base, {}).values())
+
+    def by_component(self, component):
+        """Retourne les applications utilisant un component."""
+        with self._lock:
+            self.refresh()
+            return list(self._by_component.get(component, {}).values())
+
+    def by_substitute(self, key):
+        """Retourne les applications utilisant une clé de substitute."""
+        with self._lock:
+            self.refresh()
+            return list(self._by_substitute.get(key, {}).values())
+
+    def by_annotation(self, name):
+        """Retourne les applications utilisant une annotation d'ingress."""
+        with self._lock:
+            self.refresh()
+            return list(self._by_annotation.get(name, {}).values())
+
+    def reference_counts(self, kind):
+        """
+        Retourne {nom: nombre d'applications} pour les références d'un type
+        ('component', 'substitute' ou 'annotation'), sans parcourir les applications.
+        """
+        index = {'component': self._by_component, 'substitute': self._by_substitute, 'annotation': self._by_annotation}[kind]
+        with self._lock:
+            self.refresh()
+            return {name: len(bucket) for name, bucket in index.items()}
+
+
+_UNSET = object()
+
+
+class RegistryFile:
+    """
+    Fichier de registre YAML (components, substitutes, annotations d'ingress)
+    conservé en mémoire tant que son empreinte (mtime, taille) ne change pas.
+
+    Les modifications passent par modify() : écriture atomique sous verrou
+    inter-processus, avec contrôle optimiste de version pour qu'aucune
+    modification concurrente d'un autre worker ne soit perdue. Si
+    'coalesce_window' est positif, les modifications d'une rafale sont
+    appliquées en mémoire puis écrites en une seule fois au bout de ce délai.
+    """
+
+    def __init__(self, path, coalesce_window=0, retries=5):
+        self.path = path
+        # Nom du registre dans les métriques ('components', 'substitutes', ...)
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.coalesce_window = coalesce_window
+        # Nombre de tentatives lorsque le fichier change entre lecture et écriture
+        self.retries = retries
+        # Incrémenté à chaque relecture effective du fichier et à chaque modification mise en attente
+        self.version = 0
+        self._fingerprint = _UNSET
+        self._data = None
+        self._pending = None  # (document modifié, [modifications]) en attente d'écriture
+        self._timer = None
+        self._lock = _fork_safe(threading.RLock())
+        if coalesce_window > 0:
+            # Les modifications en attente sont écrites à l'arrêt du worker
+            atexit.register(self.flush)
+
+    def load(self):
+        """
+        Retourne le document YAML, ou None si le fichier n'existe pas.
+        Le document est partagé : il ne doit pas être modifié.
+        Lève yaml.YAMLError si le fichier est invalide.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return self._pending[0]
+            fingerprint = _fingerprint(self.path)
+            if fingerprint != self._fingerprint:
+                data = None
+                if fingerprint is not None:
+                    start = time.perf_counter()
+                    with open(self.path, 'r') as f:
+                        data = yaml_io.safe_load(f)
+                    metrics.YAML_PARSE_SECONDS.labels('registry').inc(time.perf_counter() - start)
+                    metrics.YAML_FILES_PARSED.labels('registry').inc()
+                self._fingerprint = fingerprint
+                self._data = data
+                self.version += 1
+            return self._data
+
+    def invalidate(self):
+        """Force la relecture du fichier au prochain accès (après une écriture)."""
+        with self._lock:
+            self._fingerprint = _UNSET
+
+    def modify(self, mutate):
+        """
+        Applique 'mutate' au document et l'écrit si le résultat est vrai ;
+        retourne ce résultat. 'mutate' reçoit le document (modifiable) et doit
+        pouvoir être rejouée : elle l'est si un autre worker a écrit le
+        fichier entre la lecture et l'écriture.
+        """
+        if self.coalesce_window > 0:
+            return self._modify_deferred(mutate)
+
+        try:
+            for _ in range(self.retries):
+                # Lecture et modification hors verrou ; l'écriture vérifie la version lue
+                document, version = persistence.read_yaml(self.path)
+                result = mutate(document)
+                if not result:
+                    return result
+                try:
+                    persistence.write_yaml(self.path, document, expected=version, service=self.name)
+                    return result
+                except persistence.ConflictError:
+                    continue
+
+            # Forte contention : dernière tentative entièrement sous verrou
+            with persistence.file_lock(self.path):
+                document, _ = persistence.read_yaml(self.path)
+                result = mutate(document)
+                if result:
+                    persistence.atomic_write(self.path, yaml_io.dump(document, sort_keys=False), service=self.name)
+                return result
+        finally:
+            self.invalidate()
+
+    def write(self, document):
+        """Remplace tout le document (le dernier écrivain l'emporte)."""
+        def replace(current):
+            current.clear()
+            current.update(document)
+            return True
+        self.modify(replace)
+
+    def _modify_deferred(self, mutate):
+        with self._lock:
+            if self._pending is None:
+                document, _ = persistence.read_yaml(self.path)
+                self._pending = (document, [])
+            document, mutations = self._pending
+            result = mutate(document)
+            if result:
+                mutations.append(mutate)
+                # Le document servi change dès maintenant : les réponses en cache sont périmées
+                self.version += 1
+                self._schedule_flush()
+            return result
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.coalesce_window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Écrit les modifications en attente. Elles sont rejouées, dans l'ordre,
+        sur le contenu actuel du fichier lu sous verrou : les écritures des
+        autres workers survenues entre-temps sont conservées.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is None:
+                return
+            _, mutations = self._pending
+            try:
+                with persistence.file_lock(self.path):
+                    document, _ = persistence.read_yaml(self.path)
+                    for mutate in mutations:
+                        mutate(document)
+                    persistence.atomic_write(self.path, yaml_io.dump(document, sort_keys=False), service=self.name)
+            except Exception as e:
+                # Les modifications restent en attente : nouvelle tentative après le délai
+                print(f"Erreur lors de l'écriture de {self.path} : {e}")
+                self._schedule_flush()
+                return
+            self._pending = None
+            self._fingerprint = _UNSET
+
+    def export(self):
+        """Retourne l'état (empreinte, document) pour un snapshot."""
+        with self._lock:
+            if self._fingerprint is _UNSET:
+                return None
+            return (self._fingerprint, self._data)
+
+    def restore(self, state):
+        """Amorce le cache avec un état issu d'un snapshot, revalidé au prochain accès."""
+        with self._lock:
+            self._fingerprint, self._data = state
+            self.version += 1
@@ -0,0 +1,108 @@
+from collections import deque
+import threading
+
+# Sens de parcours du graphe depuis une application
+DEPENDENCIES = 'dependencies'  # ce dont l'application a besoin
+DEPENDENTS = 'dependents'  # ce qui casse si l'application tombe
+BOTH = 'both'
+DIRECTIONS = (DEPENDENCIES, DEPENDENTS, BOTH)
+
+
+def node_id(name, namespace):
+    return f"{name}:{namespace}"
+
+
+class DependencyIndex:
+    """
+    Index d'adjacence des dépendances (dependsOn), dans les deux sens.
+    Construit une seule fois par version du catalogue.
+    """
+
+    def __init__(self, apps_by_key):
+        self.forward = {}  # id -> [ids des dépendances]
+        self.reverse = {}  # id -> [ids des applications dépendantes]
+        self.nodes = {}  # id -> (name, namespace), y compris les dépendances absentes du catalogue
+        self.known = set()  # ids présents dans le catalogue
+
+        for (name, namespace), app in apps_by_key.items():
+            app_id = node_id(name, namespace)
+            self.known.add(app_id)
+            self.nodes[app_id] = (name, namespace)
+            dependencies = []
+            for dep in app.get('dependsOn') or []:
+                dep_id = node_id(dep.get('name'), dep.get('namespace'))
+                self.nodes.setdefault(dep_id, (dep.get('name'), dep.get('namespace')))
+                dependencies.append(dep_id)
+                self.reverse.setdefault(dep_id, []).append(app_id)
+            self.forward[app_id] = dependencies
+
+    def _traverse(self, source_id, depth, direction, nodes, links, seen):
+        adjacency = self.forward if direction == DEPENDENCIES else self.reverse
+        node_type = 'dependency' if direction == DEPENDENCIES else 'dependent'
+        processed = {source_id}
+        queue = deque([(source_id, 0)])
+
+        while queue:
+            current_id, current_depth = queue.popleft()
+            if current_depth >= depth:
+                continue
+            for next_id in adjacency.get(current_id, ()):
+                # Les liens vont toujours de la dépendance vers l'application qui en dépend
+                if direction == DEPENDENCIES:
+                    links.append({'source': next_id, 'target': current_id, 'type': 'dependency'})
+                else:
+                    links.append({'source': current_id, 'target': next_id, 'type': 'dependency'})
+                if next_id in processed:
+                    continue
+                processed.add(next_id)
+                if next_id not in seen:
+                    seen.add(next_id)
+                    name, namespace = self.nodes[next_id]
+                    nodes.append({
+                        'id': next_id,
+                        'name': name,
+                        'namespace': namespace,
+                        'level': current_depth + 1,
+                        'type': node_type,
+                    })
+                queue.append((next_id, current_depth + 1))
+
+    def tree(self, name, namespace, depth, direction=DEPENDENCIES):
+        """
+        Parcours en largeur depuis (name, namespace), limité à 'depth' niveaux
+        (float('inf') pour tout le graphe). Retourne {'nodes': [...], 'links': [...]}.
+        """
+        source_id = node_id(name, namespace)
+        if source_id not in self.known:
+            return {'nodes': [], 'links': []}
+
+        nodes = [{'id': source_id, 'name': name, 'namespace': namespace, 'level': 0, 'type': 'source'}]
+        links = []
+        seen = {source_id}
+        if direction in (DEPENDENCIES, BOTH):
+            self._traverse(source_id, depth, DEPENDENCIES, nodes, links, seen)
+        if direction in (DEPENDENTS, BOTH):
+            self._traverse(source_id, depth, DEPENDENTS, nodes, links, seen)
+        if direction == BOTH:
+            # Un cycle peut faire apparaître le même lien dans les deux parcours
+            links = list({(link['source'], link['target']): link for link in links}.values())
+        return {'nodes': nodes, 'links': links}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_index(catalog):
+    """Retourne l'index de dépendances correspondant à la version courante du catalogue."""
+    global _cache
+    catalog.refresh()
+    # Version lue avant la copie : au pire, l'index est reconstruit une fois de trop
+    version = catalog.version
+    with _cache_lock:
+        if _cache is not None and _cache[0] is catalog and _cache[1] == version:
+            return _cache[2]
+    index = DependencyIndex(catalog.by_key())
+    with _cache_lock:
+        _cache = (catalog, version, index)
+    return index
@@ -0,0 +1,73 @@
+"""
+Export en flux du catalogue des applications.
+
+Les applications sont sérialisées par lots et produites au fil de l'eau :
+la mémoire utilisée et le délai avant le premier octet ne dépendent pas de
+la taille du catalogue.
+
+Formats : NDJSON (une application JSON par ligne) et, si le paquet
+'msgpack' est installé, une suite d'objets MessagePack concaténés
+(lisible avec msgpack.Unpacker). Chaque format peut être compressé en gzip.
+"""
+import json
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+NDJSON = 'ndjson'
+MSGPACK = 'msgpack'
+
+MIMETYPES = {
+    NDJSON: 'application/x-ndjson',
+    MSGPACK: 'application/x-msgpack',
+}
+
+# Nombre d'applications sérialisées par morceau envoyé
+BATCH_SIZE = 200
+
+
+def available_formats():
+    return [NDJSON, MSGPACK] if msgpack is not None else [NDJSON]
+
+
+def _ndjson_encoder():
+    # default=str : les dates YAML (datetime.date) sont exportées en ISO 8601
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str)
+    return lambda app: (encoder.encode(app) + '\n').encode('utf-8')
+
+
+def _msgpack_encoder():
+    packer = msgpack.Packer(default=str)
+    return packer.pack
+
+
+def iter_export(applications, fmt=NDJSON, compress=False):
+    """
+    Générateur de morceaux d'octets pour l'export de 'applications' (itérable)
+    au format 'fmt', compressés en gzip si 'compress' est vrai.
+    """
+    if fmt not in available_formats():
+        raise ValueError(f"Format d'export non disponible : {fmt}")
+    encode = _msgpack_encoder() if fmt == MSGPACK else _ndjson_encoder()
+    # wbits=31 : en-tête et somme de contrôle gzip
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    batch = []
+    for app in applications:
+        batch.append(encode(app))
+        if len(batch) >= BATCH_SIZE:
+            chunk = b''.join(batch)
+            batch = []
+            if compressor:
+                # Z_SYNC_FLUSH : le client peut décompresser chaque morceau dès réception
+                chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield chunk
+
+    chunk = b''.join(batch)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,136 @@
+import threading
+
+from services.apps import dependency_index
+
+
+def _strongly_connected_components(successors):
+    """
+    Algorithme de Tarjan (itératif, sans récursion) sur un graphe numéroté.
+    Les composantes sont produites dépendances d'abord : une composante n'est
+    émise qu'après toutes celles qu'elle atteint.
+    """
+    count = len(successors)
+    index = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            node, position = work[-1]
+            if position < len(successors[node]):
+                work[-1] = (node, position + 1)
+                child = successors[node][position]
+                if index[child] == -1:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, 0))
+                elif on_stack[child]:
+                    low[node] = min(low[node], index[child])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+class GraphAnalytics:
+    """
+    Analyses du graphe dependsOn, calculées une fois par version du catalogue :
+    composantes fortement connexes (cycles), ordre topologique et index
+    d'atteignabilité par bitsets (un entier Python par composante), qui rend
+    la question « A est-il en amont de B ? » en O(1).
+    """
+
+    def __init__(self, index):
+        self.ids = sorted(index.nodes)
+        position = {node: i for i, node in enumerate(self.ids)}
+        successors = [[position[dep] for dep in index.forward.get(node, ())] for node in self.ids]
+
+        self.components = _strongly_connected_components(successors)
+        self.component_of = [0] * len(self.ids)
+        for c, component in enumerate(self.components):
+            for member in component:
+                self.component_of[member] = c
+
+        # Une composante est un cycle si elle a plusieurs membres ou une auto-dépendance
+        self.self_loops = {node for node in range(len(self.ids)) if node in successors[node]}
+        self.cyclic = [len(component) > 1 or component[0] in self.self_loops for component in self.components]
+
+        # reach[c] : bitset des composantes dont c dépend (directement ou non), c inclus.
+        # Les composantes étant numérotées dépendances d'abord, reach[d] est déjà calculé.
+        self.reach = []
+        for c, component in enumerate(self.components):
+            bits = 1 << c
+            for member in component:
+                for dep in successors[member]:
+                    if self.component_of[dep] != c:
+                        bits |= self.reach[self.component_of[dep]]
+            self.reach.append(bits)
+        self._position = position
+
+    def cycles(self):
+        """Retourne les cycles de dépendances, chacun sous forme de liste d'ids triés."""
+        return [
+            sorted(self.ids[member] for member in component)
+            for component, cyclic in zip(self.components, self.cyclic) if cyclic
+        ]
+
+    def topological_order(self):
+        """
+        Retourne les ids dans l'ordre de déploiement (dépendances avant les
+        applications qui en dépendent). Les membres d'un cycle sont regroupés.
+        """
+        return [self.ids[member] for component in self.components for member in sorted(component)]
+
+    def depends_on(self, node, other):
+        """Vrai si 'node' dépend, directement ou transitivement, de 'other'."""
+        a = self._position.get(node)
+        b = self._position.get(other)
+        if a is None or b is None:
+            return False
+        ca, cb = self.component_of[a], self.component_of[b]
+        if ca == cb:
+            # Même composante : dépendance mutuelle (ou sur soi-même) si c'est un cycle
+            return self.cyclic[ca]
+        return bool(self.reach[ca] >> cb & 1)
+
+    def is_upstream(self, upstream, downstream):
+        """Vrai si 'upstream' est en amont de 'downstream' (downstream en dépend)."""
+        return self.depends_on(downstream, upstream)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_analytics(catalog):
+    """Retourne les analyses du graphe pour la version courante du catalogue."""
+    global _cache
+    index = dependency_index.get_index(catalog)
+    with _cache_lock:
+        if _cache is None or _cache[0] is not index:
+            _cache = (index, GraphAnalytics(index))
+        return _cache[1]
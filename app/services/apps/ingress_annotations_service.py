@@ -1,78 +1,113 @@
 import yaml
-from config import DATA_PATHS
+import copy
+from config import DATA_PATHS, PERSISTENCE_SETTINGS
+from services.apps.catalog import RegistryFile
 import os
-REPO_PATH = os.environ.get('REPO_PATH')
+REPO_PATH = os.environ.get('REPO_PATH', '')
 # Chemin du répertoire racine des applications
 ANNOTATIONS_PATH = REPO_PATH+"/"+DATA_PATHS.get('ingress_annotations')
 
+# Fichier mis en cache : relu uniquement lorsqu'il a changé sur le disque
+registry = RegistryFile(ANNOTATIONS_PATH, coalesce_window=PERSISTENCE_SETTINGS.get('coalesce_window', 0))
+
 def load_data():
     """
     Charge les données de l'entité 'ingressAnnotations' depuis le fichier YAML.
     """
-    if not os.path.exists(ANNOTATIONS_PATH):
-        return []
     try:
-        with open(ANNOTATIONS_PATH, 'r') as f:
-            data = yaml.safe_load(f)
-            if data and 'metadatas' in data and 'apps' in data['metadatas'] and 'ingress_annotations' in data['metadatas']['apps']:
-                return data['metadatas']['apps']['ingress_annotations']
+        data = registry.load()
+        if data and 'metadatas' in data and 'apps' in data['metadatas'] and 'ingress_annotations' in data['metadatas']['apps']:
+            return copy.deepcopy(data['metadatas']['apps']['ingress_annotations'])
     except (yaml.YAMLError, FileNotFoundError) as e:
         print(f"Erreur de lecture du fichier des annotations d'ingress : {e}")
         return []
     return []
 
+def data_version():
+    """Version du fichier en cache, incrémentée à chaque relecture (None s'il est illisible)."""
+    try:
+        registry.load()
+    except (yaml.YAMLError, FileNotFoundError):
+        return None
+    return registry.version
+
+def _entities(document):
+    """Retourne la liste des 'ingressAnnotations' du document, en créant la hiérarchie si besoin."""
+    if 'metadatas' not in document:
+        document['metadatas'] = {}
+    if 'apps' not in document['metadatas']:
+        document['metadatas']['apps'] = {}
+    if document['metadatas']['apps'].get('ingress_annotations') is None:
+        document['metadatas']['apps']['ingress_annotations'] = []
+    return document['metadatas']['apps']['ingress_annotations']
+
+def _modify(mutate):
+    """
+    Applique 'mutate' à la liste des 'ingressAnnotations' lue sur le disque et écrit
+    le fichier si elle retourne une valeur vraie (voir RegistryFile.modify).
+    """
+    return registry.modify(lambda document: mutate(_entities(document)))
+
 def save_data(new_annotations):
     """
     Sauvegarde la liste complète des 'ingressAnnotations' dans le fichier YAML.
     """
-    full_yaml_data = {}
-    if os.path.exists(ANNOTATIONS_PATH):
-        with open(ANNOTATIONS_PATH, 'r') as f:
-            full_yaml_data = yaml.safe_load(f) or {}
-
-    if 'metadatas' not in full_yaml_data:
-        full_yaml_data['metadatas'] = {}
-    if 'apps' not in full_yaml_data['metadatas']:
-        full_yaml_data['metadatas']['apps'] = {}
-        
-    full_yaml_data['metadatas']['apps']['ingress_annotations'] = new_annotations
-    
-    with open(ANNOTATIONS_PATH, 'w') as f:
-        yaml.dump(full_yaml_data, f, sort_keys=False)
+    def replace(entities):
+        entities[:] = new_annotations
+        return True
+    _modify(replace)
 
 def create_annotation(nom):
     """
     Ajoute une nouvelle annotation si elle n'existe pas déjà.
     """
-    data = load_data()
-    if any(a['nom'] == nom for a in data):
-        return None  # L'annotation existe déjà
+    def create(data):
+        if any(a['nom'] == nom for a in data):
+            return None  # L'annotation existe déjà
 
-    data.append({'nom': nom})
-    save_data(data)
-    return {'nom': nom}
+        data.append({'nom': nom})
+        return {'nom': nom}
+
+    return _modify(create)
 
 def update_annotation(old_nom, new_nom):
     """
     Met à jour le nom d'une annotation existante.
     """
-    data = load_data()
-    for a in data:
-        if a['nom'] == old_nom:
-            a['nom'] = new_nom
-            save_data(data)
-            return a
-    return None
+    def update(data):
+        for a in data:
+            if a['nom'] == old_nom:
+                a['nom'] = new_nom
+                return a
+        return None
+
+    return _modify(update)
 
 def delete_annotation(nom):
     """
     Supprime une annotation par son nom.
+    Retourne les entrées retirées [(position, entrée)], vide si absent.
+    """
+    def delete(data):
+        removed = [(i, a) for i, a in enumerate(data) if a['nom'] == nom]
+        if removed:
+            data[:] = [a for a in data if a['nom'] != nom]
+        return removed
+
+    return _modify(delete)
+
+def restore_annotation(removed):
+    """
+    Remet en place des entrées retirées par delete_annotation, à leur position
+    d'origine (annulation d'une suppression). Sans effet si le nom existe à nouveau.
     """
-    data = load_data()
-    initial_len = len(data)
-    data = [a for a in data if a['nom'] != nom]
-    
-    if len(data) < initial_len:
-        save_data(data)
+    nom = removed[0][1]['nom']
+
+    def restore(data):
+        if any(a['nom'] == nom for a in data):
+            return False
+        for position, entry in removed:
+            data.insert(position, entry)
         return True
-    return False
\ No newline at end of file
+
+    return _modify(restore)
\ No newline at end of file
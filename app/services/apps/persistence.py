@@ -0,0 +1,158 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+
+import metrics
+import yaml_io
+from config import PERSISTENCE_SETTINGS
+
+# Répertoire des fichiers de verrou, hors du dépôt git pour ne pas le polluer
+LOCK_DIR = PERSISTENCE_SETTINGS.get('lock_dir', '/tmp/home-k8s-metadata/locks')
+
+
+# Valeur par défaut de write_yaml : écriture sans vérification de version
+ANY = object()
+
+
+class ConflictError(Exception):
+    """Le fichier a été modifié par un autre processus depuis sa lecture."""
+
+
+def file_version(path):
+    """
+    Identifie l'état d'un fichier : (inode, mtime, taille), ou None s'il
+    n'existe pas. Les écritures se faisant par renommage, chaque écriture
+    change l'inode, même si la date et la taille restent identiques.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+# Verrous déjà détenus par le thread courant (file_lock est réentrant)
+_held = threading.local()
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Verrou exclusif inter-processus (flock) associé à un fichier de données.
+    Réentrant : un thread qui le détient déjà peut le reprendre.
+    """
+    name = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+    held = _held.__dict__.setdefault('names', set())
+    if name in held:
+        yield
+        return
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(os.path.join(LOCK_DIR, f"{name}.lock"), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        held.add(name)
+        try:
+            yield
+        finally:
+            held.discard(name)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_locks(paths):
+    """Verrouille plusieurs fichiers, toujours dans le même ordre pour éviter les interblocages."""
+    with ExitStack() as stack:
+        for path in sorted({os.path.abspath(path) for path in paths}):
+            stack.enter_context(file_lock(path))
+        yield
+
+
+class ChangeCounter:
+    """
+    Compteur de modifications partagé par les processus (workers gunicorn) :
+    un entier de 8 octets dans un fichier projeté en mémoire. La lecture ne
+    fait aucun appel système ; l'incrément est fait sous verrou.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+
+    def _mapped(self):
+        if self._map is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a+b') as f:
+                if os.fstat(f.fileno()).st_size < 8:
+                    f.truncate(8)
+                self._map = mmap.mmap(f.fileno(), 8)
+        return self._map
+
+    def value(self):
+        return struct.unpack_from('Q', self._mapped())[0]
+
+    def bump(self):
+        """Incrémente le compteur et retourne sa nouvelle valeur."""
+        with file_lock(self.path):
+            value = self.value() + 1
+            struct.pack_into('Q', self._mapped(), 0, value)
+        return value
+
+
+def read_yaml(path):
+    """Lit un document YAML et retourne (document, version du fichier lu) ; ({}, None) s'il n'existe pas."""
+    try:
+        with open(path, 'r') as f:
+            stat = os.fstat(f.fileno())
+            document = yaml_io.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}, None
+    return document, (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def atomic_write(path, text, service=None):
+    """
+    Remplace le contenu d'un fichier de manière atomique : écriture dans un
+    fichier temporaire du même répertoire, fsync, puis renommage. Un arrêt
+    brutal laisse soit l'ancien contenu, soit le nouveau, jamais un fichier tronqué.
+    Les octets écrits sont comptés pour 'service' s'il est fourni.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}-", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            # Conserve les droits du fichier d'origine (mkstemp crée en 0600)
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        if service:
+            metrics.record_write(service, text)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_yaml(path, document, expected=ANY, service=None):
+    """
+    Écrit un document YAML de manière atomique, sous verrou inter-processus.
+    Si 'expected' est fourni (version retournée par read_yaml, None pour un
+    fichier absent), l'écriture n'a lieu que si le fichier n'a pas changé
+    depuis : ConflictError sinon.
+    """
+    text = yaml_io.dump(document, sort_keys=False)
+    with file_lock(path):
+        if expected is not ANY and file_version(path) != expected:
+            raise ConflictError(f"{path} a été modifié par un autre processus")
+        atomic_write(path, text, service)
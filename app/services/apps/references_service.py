@@ -0,0 +1,140 @@
+"""
+Références des applications vers les registres (components, substitutes,
+annotations d'ingress).
+
+Les recherches passent par les index inversés du catalogue (nom ->
+applications) : aucune application n'est parcourue. Un renommage ou une
+suppression dans un registre peut être répercuté sur les seules
+applications concernées, en un lot unique (voir applications_service.apply_batch) :
+chaque fichier d'application n'est lu et écrit qu'une fois.
+"""
+from services.apps import applications_service, components_service, substitutes_service, ingress_annotations_service
+from services.apps.catalog import annotation_names, component_names, substitute_keys
+
+
+def _rewrite_components(app, old, new):
+    components = []
+    for component in app.get('components') or []:
+        name = component.get('path') or component.get('nom') if isinstance(component, dict) else component
+        if name != old:
+            components.append(component)
+        elif new is not None:
+            if isinstance(component, dict):
+                component = dict(component, **{'path' if 'path' in component else 'nom': new})
+            else:
+                component = new
+            components.append(component)
+    return {'components': components}
+
+
+def _rewrite_substitutes(app, old, new):
+    substitutes = []
+    for substitute in app.get('substitute') or []:
+        key = substitute.get('key') if isinstance(substitute, dict) else substitute
+        if key != old:
+            substitutes.append(substitute)
+        elif new is not None:
+            substitutes.append(dict(substitute, key=new) if isinstance(substitute, dict) else new)
+    return {'substitute': substitutes}
+
+
+def _rewrite_annotations(app, old, new):
+    ingress = dict(app.get('ingress') or {})
+    annotations = {}
+    # L'ordre des annotations est conservé, la clé renommée garde sa position
+    for name, value in (ingress.get('annotations') or {}).items():
+        if name != old:
+            annotations[name] = value
+        elif new is not None:
+            annotations[new] = value
+    ingress['annotations'] = annotations
+    return {'ingress': ingress}
+
+
+# Type de référence -> (index du catalogue, noms référencés par une application, réécriture, service du registre)
+KINDS = {
+    'components': ('component', component_names, _rewrite_components, components_service),
+    'substitutes': ('substitute', substitute_keys, _rewrite_substitutes, substitutes_service),
+    'ingress_annotations': ('annotation', annotation_names, _rewrite_annotations, ingress_annotations_service),
+}
+
+
+def _applications(kind, name):
+    index = KINDS[kind][0]
+    lookup = {
+        'component': applications_service.catalog.by_component,
+        'substitute': applications_service.catalog.by_substitute,
+        'annotation': applications_service.catalog.by_annotation,
+    }[index]
+    return sorted(lookup(name), key=lambda app: (app.get('name') or '', app.get('namespace') or ''))
+
+
+def usage(kind):
+    """
+    Retourne {nom: {'count': n, 'applications': ['name:namespace', ...]}} pour
+    chaque entrée du registre (n = 0 si elle n'est pas utilisée) et chaque nom
+    référencé par une application sans figurer dans le registre.
+    """
+    index, _, _, service = KINDS[kind]
+    names = [entry.get('nom') for entry in service.load_data() if entry.get('nom')]
+    names += [name for name in applications_service.catalog.reference_counts(index) if name not in names]
+    result = {}
+    for name in names:
+        applications = [f"{app.get('name')}:{app.get('namespace')}" for app in _applications(kind, name)]
+        result[name] = {'count': len(applications), 'applications': applications}
+    return result
+
+
+def plan_cascade(kind, old, new=None):
+    """
+    Opérations de mise à jour (format apply_batch) renommant la référence
+    'old' en 'new' dans chaque application qui l'utilise, ou la retirant si
+    'new' vaut None.
+    """
+    _, _, rewrite, _ = KINDS[kind]
+    operations = []
+    for app in _applications(kind, old):
+        operations.append({
+            'op': 'update',
+            'base': app.get('base'),
+            'name': app.get('name'),
+            'namespace': app.get('namespace'),
+            'data': rewrite(app, old, new),
+        })
+    return operations
+
+
+def _run_batch(operations, dry_run=False):
+    if operations:
+        applied, results = applications_service.apply_batch(operations, dry_run=dry_run)
+        if not applied:
+            errors = [result['error'] for result in results if result['status'] == 'error']
+            raise RuntimeError(f"Répercussion sur les applications refusée : {'; '.join(errors)}")
+
+
+def check_cascade(kind, old, new=None):
+    """
+    Valide la répercussion sans rien écrire, avant de modifier le registre ;
+    lève RuntimeError si le lot serait refusé.
+    """
+    _run_batch([] if old == new else plan_cascade(kind, old, new), dry_run=True)
+
+
+def cascade(kind, old, new=None, dry_run=False):
+    """
+    Répercute un renommage (ou une suppression si 'new' vaut None) sur les
+    applications concernées, en un seul lot. Avec dry_run, rien n'est écrit.
+
+    Retourne {'applications': ['name:namespace', ...], 'count': n} ; lève
+    RuntimeError si le lot a été refusé.
+    """
+    operations = [] if old == new else plan_cascade(kind, old, new)
+    summary = {
+        'applications': [f"{operation['name']}:{operation['namespace']}" for operation in operations],
+        'count': len(operations),
+    }
+    if dry_run:
+        summary['operations'] = operations
+        return summary
+    _run_batch(operations)
+    return summary
@@ -0,0 +1,116 @@
+import marshal
+import os
+import stat
+import tempfile
+import time
+import threading
+
+MAGIC = b'HKMSNAP'
+# À incrémenter à chaque changement du format : les snapshots existants sont alors ignorés
+FORMAT_VERSION = 2
+
+
+def _private(st):
+    """Vrai si le fichier ou répertoire appartient au processus et n'est modifiable que par lui."""
+    return st.st_uid == os.geteuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+class CatalogSnapshot:
+    """
+    Snapshot sur disque du catalogue analysé (applications et registres).
+
+    Chaque entrée est conservée avec l'empreinte (mtime, taille) de son
+    fichier : un nouveau worker recharge le snapshot puis ne relit que les
+    fichiers modifiés depuis son écriture.
+
+    Le snapshot est sérialisé avec marshal (données simples uniquement,
+    aucun code exécuté au chargement) dans un répertoire privé ; il est
+    ignoré s'il n'appartient pas à l'utilisateur du processus ou s'il est
+    modifiable par d'autres.
+    """
+
+    def __init__(self, path, catalog, registries, min_interval=30):
+        self.path = path
+        self.catalog = catalog
+        self.registries = registries  # nom -> RegistryFile
+        # Délai minimal (en secondes) entre deux écritures du snapshot
+        self.min_interval = min_interval
+        self._saved_versions = None
+        self._last_save = None
+        self._lock = threading.Lock()
+
+    def _versions(self):
+        return (self.catalog.version,) + tuple(registry.version for registry in self.registries.values())
+
+    def restore(self):
+        """Charge le snapshot s'il existe et s'il est compatible. Retourne True en cas de succès."""
+        try:
+            with open(self.path, 'rb') as f:
+                if not (_private(os.fstat(f.fileno())) and _private(os.stat(os.path.dirname(self.path) or '.'))):
+                    print(f"Snapshot du catalogue ignoré ({self.path}) : fichier ou répertoire modifiable par un autre utilisateur")
+                    return False
+                header = f.read(len(MAGIC) + 4)
+                if header[:len(MAGIC)] != MAGIC or int.from_bytes(header[len(MAGIC):], 'big') != FORMAT_VERSION:
+                    return False
+                state = marshal.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Snapshot du catalogue ignoré ({self.path}) : {e}")
+            return False
+
+        if state.get('root_path') != self.catalog.root_path:
+            return False
+        self.catalog.restore_files(state['applications'])
+        for name, registry in self.registries.items():
+            entry = state['registries'].get(name)
+            if entry and entry[0] == registry.path:
+                registry.restore(entry[1])
+        self._saved_versions = self._versions()
+        return True
+
+    def save(self):
+        """Écrit le snapshot de manière atomique (fichier temporaire puis renommage)."""
+        with self._lock:
+            versions = self._versions()
+            registries = {}
+            for name, registry in self.registries.items():
+                state = registry.export()
+                if state is not None:
+                    registries[name] = (registry.path, state)
+            state = {
+                'root_path': self.catalog.root_path,
+                'applications': self.catalog.export_files(),
+                'registries': registries,
+            }
+
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            if not _private(os.stat(directory)):
+                raise PermissionError(f"le répertoire {directory} est modifiable par un autre utilisateur")
+            # mkstemp crée le fichier en mode 0600
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-snapshot-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(MAGIC + FORMAT_VERSION.to_bytes(4, 'big'))
+                    # ValueError si une valeur n'est pas sérialisable (ex. date YAML)
+                    marshal.dump(state, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._saved_versions = versions
+            self._last_save = time.monotonic()
+
+    def save_if_stale(self):
+        """Réécrit le snapshot si le catalogue a changé, au plus une fois par 'min_interval'."""
+        if self._versions() == self._saved_versions:
+            return False
+        if self._last_save is not None and time.monotonic() - self._last_save < self.min_interval:
+            return False
+        try:
+            self.save()
+        except (OSError, ValueError) as e:
+            print(f"Erreur lors de l'écriture du snapshot du catalogue : {e}")
+            return False
+        return True
@@ -1,80 +1,114 @@
 import yaml
-from config import DATA_PATHS
+import copy
+from config import DATA_PATHS, PERSISTENCE_SETTINGS
+from services.apps.catalog import RegistryFile
 import os
 
-REPO_PATH = os.environ.get('REPO_PATH')
+REPO_PATH = os.environ.get('REPO_PATH', '')
 # Chemin du répertoire racine des applications
 SUBSTITUTES_PATH = REPO_PATH+"/"+DATA_PATHS.get('substitutes')
 
+# Fichier mis en cache : relu uniquement lorsqu'il a changé sur le disque
+registry = RegistryFile(SUBSTITUTES_PATH, coalesce_window=PERSISTENCE_SETTINGS.get('coalesce_window', 0))
+
 def load_data():
     """
     Charge les données de l'entité 'substitute' depuis le fichier YAML.
     """
-    if not os.path.exists(SUBSTITUTES_PATH):
-        return []
     try:
-        with open(SUBSTITUTES_PATH, 'r') as f:
-            data = yaml.safe_load(f)
-            if data and 'metadatas' in data and 'apps' in data['metadatas'] and 'substitutes' in data['metadatas']['apps']:
-                return data['metadatas']['apps']['substitutes']
+        data = registry.load()
+        if data and 'metadatas' in data and 'apps' in data['metadatas'] and 'substitutes' in data['metadatas']['apps']:
+            return copy.deepcopy(data['metadatas']['apps']['substitutes'])
     except (yaml.YAMLError, FileNotFoundError) as e:
         print(f"Erreur de lecture du fichier des substitutes : {e}")
         return []
     return []
 
+def data_version():
+    """Version du fichier en cache, incrémentée à chaque relecture (None s'il est illisible)."""
+    try:
+        registry.load()
+    except (yaml.YAMLError, FileNotFoundError):
+        return None
+    return registry.version
+
+def _entities(document):
+    """Retourne la liste des 'substitutes' du document, en créant la hiérarchie si besoin."""
+    if 'metadatas' not in document:
+        document['metadatas'] = {}
+    if 'apps' not in document['metadatas']:
+        document['metadatas']['apps'] = {}
+    if document['metadatas']['apps'].get('substitutes') is None:
+        document['metadatas']['apps']['substitutes'] = []
+    return document['metadatas']['apps']['substitutes']
+
+def _modify(mutate):
+    """
+    Applique 'mutate' à la liste des 'substitutes' lue sur le disque et écrit
+    le fichier si elle retourne une valeur vraie (voir RegistryFile.modify).
+    """
+    return registry.modify(lambda document: mutate(_entities(document)))
+
 def save_data(new_substitutes):
     """
     Sauvegarde la liste complète des 'substitutes' dans le fichier YAML.
     """
-    full_yaml_data = {}
-    if os.path.exists(SUBSTITUTES_PATH):
-        with open(SUBSTITUTES_PATH, 'r') as f:
-            full_yaml_data = yaml.safe_load(f) or {}
-
-    # Assurez-vous que la hiérarchie existe
-    if 'metadatas' not in full_yaml_data:
-        full_yaml_data['metadatas'] = {}
-    if 'apps' not in full_yaml_data['metadatas']:
-        full_yaml_data['metadatas']['apps'] = {}
-        
-    full_yaml_data['metadatas']['apps']['substitutes'] = new_substitutes
-    
-    with open(SUBSTITUTES_PATH, 'w') as f:
-        yaml.dump(full_yaml_data, f, sort_keys=False)
+    def replace(entities):
+        entities[:] = new_substitutes
+        return True
+    _modify(replace)
 
 def create_substitute(nom):
     """
     Ajoute un nouveau 'substitute' s'il n'existe pas déjà.
     """
-    data = load_data()
-    if any(s['nom'] == nom for s in data):
-        return None  # Le substitute existe déjà
+    def create(data):
+        if any(s['nom'] == nom for s in data):
+            return None  # Le substitute existe déjà
 
-    data.append({'nom': nom})
-    save_data(data)
-    return {'nom': nom}
+        data.append({'nom': nom})
+        return {'nom': nom}
+
+    return _modify(create)
 
 def update_substitute(old_nom, new_nom):
     """
     Met à jour le nom d'un 'substitute' existant.
     """
-    data = load_data()
-    for s in data:
-        if s['nom'] == old_nom:
-            s['nom'] = new_nom
-            save_data(data)
-            return s
-    return None
+    def update(data):
+        for s in data:
+            if s['nom'] == old_nom:
+                s['nom'] = new_nom
+                return s
+        return None
+
+    return _modify(update)
 
 def delete_substitute(nom):
     """
     Supprime un 'substitute' par son nom.
+    Retourne les entrées retirées [(position, entrée)], vide si absent.
+    """
+    def delete(data):
+        removed = [(i, s) for i, s in enumerate(data) if s['nom'] == nom]
+        if removed:
+            data[:] = [s for s in data if s['nom'] != nom]
+        return removed
+
+    return _modify(delete)
+
+def restore_substitute(removed):
+    """
+    Remet en place des entrées retirées par delete_substitute, à leur position
+    d'origine (annulation d'une suppression). Sans effet si le nom existe à nouveau.
     """
-    data = load_data()
-    initial_len = len(data)
-    data = [s for s in data if s['nom'] != nom]
-    
-    if len(data) < initial_len:
-        save_data(data)
+    nom = removed[0][1]['nom']
+
+    def restore(data):
+        if any(s['nom'] == nom for s in data):
+            return False
+        for position, entry in removed:
+            data.insert(position, entry)
         return True
-    return False
\ No newline at end of file
+
+    return _modify(restore)
\ No newline at end of file
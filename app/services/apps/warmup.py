@@ -0,0 +1,85 @@
+"""
+Préchauffage du processus avant qu'il ne reçoive du trafic.
+
+warm_up() charge entièrement le catalogue et les registres, construit les
+index du graphe de dépendances et remplit les caches de réponses des pages
+et API les plus lourdes. Avec gunicorn et preload_app, il s'exécute une fois
+dans le maître : les workers héritent de ces structures par copie sur
+écriture au lieu de les reconstruire.
+
+status() alimente /readyz : le processus n'est prêt qu'une fois le
+préchauffage terminé sans erreur.
+"""
+import os
+import threading
+import time
+
+from services.apps import applications_service, components_service, substitutes_service, ingress_annotations_service
+from services.apps import graph_analytics
+
+# Vues préchauffées (endpoint Flask, URL) : leurs réponses sont mises en cache
+WARM_VIEWS = [
+    ('applications.applications_page', '/apps/applications'),
+    ('applications.get_applications', '/apps/api/applications'),
+    ('applications.get_global_graph_data', '/apps/api/applications/global-graph-data'),
+]
+
+_state = {
+    'ready': False,
+    'started_at': None,
+    'finished_at': None,
+    'load_seconds': None,
+    'error': None,
+}
+_lock = threading.Lock()
+
+
+def warm_up(app):
+    """Préchauffe le processus ; retourne True en cas de succès."""
+    start = time.monotonic()
+    with _lock:
+        _state.update(ready=False, started_at=time.time(), error=None)
+    try:
+        if not os.path.isdir(applications_service.ROOT_PATH):
+            # Un catalogue vide ne doit pas être servi comme s'il était prêt
+            raise FileNotFoundError(f"répertoire des applications introuvable : {applications_service.ROOT_PATH}")
+        for service in (components_service, substitutes_service, ingress_annotations_service):
+            service.load_data()
+        applications_service.catalog.refresh(force=True)
+        applications_service.load_data()
+        graph_analytics.get_analytics(applications_service.catalog)
+        for endpoint, url in WARM_VIEWS:
+            with app.test_request_context(url):
+                app.view_functions[endpoint]()
+    except Exception as e:
+        with _lock:
+            _state.update(error=str(e), finished_at=time.time())
+        app.logger.error(f"Échec du préchauffage : {e}")
+        return False
+
+    duration = time.monotonic() - start
+    with _lock:
+        _state.update(ready=True, finished_at=time.time(), load_seconds=round(duration, 3))
+    app.logger.info(
+        f"Préchauffage terminé en {duration:.2f} s ({applications_service.catalog.size()} applications)")
+    return True
+
+
+def fail(app, error):
+    """Marque le processus comme non prêt sans préchauffage (ex. échec du clonage)."""
+    with _lock:
+        _state.update(ready=False, error=error, finished_at=time.time())
+    app.logger.error(f"Processus non prêt : {error}")
+
+
+def status():
+    """
+    Retourne (prêt, détails). Ne prend aucun verrou du catalogue : la
+    réponse reste immédiate pendant un rafraîchissement.
+    """
+    with _lock:
+        details = dict(_state)
+    catalog = applications_service.catalog
+    details.update(catalog_version=catalog.version, applications=catalog.size())
+
+    return details['ready'], details
@@ -0,0 +1,199 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# Masques inotify (voir <sys/inotify.h>)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Marqueur d'événement demandant une revalidation complète de l'arborescence
+RESCAN = object()
+
+
+class InotifyBackend:
+    """Source d'événements basée sur inotify (Linux), via ctypes."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 a échoué")
+        self._watches = {}  # descripteur de watch -> répertoire
+
+    def add_watch(self, directory, recursive=False):
+        """Surveille un répertoire (et ses sous-répertoires si 'recursive')."""
+        directories = [directory]
+        if recursive:
+            directories += [os.path.join(root, d) for root, dirs, _ in os.walk(directory) for d in dirs]
+        for path in directories:
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = (path, recursive)
+
+    def read_events(self, timeout):
+        """
+        Attend au plus 'timeout' secondes et retourne la liste des chemins
+        concernés (ou RESCAN si la file du noyau a débordé).
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append(RESCAN)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            watched = self._watches.get(wd)
+            if watched is None:
+                continue
+            directory, recursive = watched
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if mask & IN_ISDIR or mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                # Répertoire créé, déplacé ou supprimé : les fichiers qu'il contient
+                # ont pu changer avant la pose d'un watch, on revalide l'arborescence
+                if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_watch(path, recursive=True)
+                events.append(RESCAN)
+            else:
+                events.append(path)
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CatalogWatcher:
+    """
+    Met à jour le catalogue et les registres lorsque leurs fichiers changent
+    en dehors de l'application (édition manuelle, git pull, autres workers).
+
+    Les événements sont regroupés par rafales ('debounce' secondes sans
+    nouvel événement) puis seuls les fichiers concernés sont relus. Une fois
+    le watcher démarré, les lectures du catalogue ne parcourent plus
+    l'arborescence. Sans inotify, un thread de polling revalide le catalogue
+    toutes les 'poll_interval' secondes.
+    """
+
+    def __init__(self, catalog, registries, debounce=0.2, poll_interval=2, backend='auto'):
+        self.catalog = catalog
+        self.registries = registries  # liste de RegistryFile
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = backend
+        self._backend = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _create_backend(self):
+        if self.backend == 'poll' or not sys.platform.startswith('linux'):
+            return None
+        if not os.path.isdir(self.catalog.root_path):
+            return None
+        try:
+            backend = InotifyBackend()
+        except (OSError, AttributeError) as e:
+            print(f"inotify indisponible, utilisation du polling : {e}")
+            return None
+        backend.add_watch(self.catalog.root_path, recursive=True)
+        for directory in {os.path.dirname(registry.path) for registry in self.registries}:
+            if os.path.isdir(directory):
+                backend.add_watch(directory)
+        return backend
+
+    def start(self):
+        """Démarre la surveillance dans un thread d'arrière-plan."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        # Les watches sont posés avant la revalidation initiale pour ne manquer aucun changement
+        self._backend = self._create_backend()
+        self.catalog.watched = True
+        # Le thread n'est pas copié par fork() : un processus enfant doit revalider le catalogue lui-même
+        os.register_at_fork(after_in_child=self._forked)
+        self.catalog.refresh(force=True)
+        target = self._run_inotify if self._backend else self._run_polling
+        self._thread = threading.Thread(target=target, name='catalog-watcher', daemon=True)
+        self._thread.start()
+
+    def _forked(self):
+        if self._thread is not None:
+            self.catalog.watched = False
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+        self.catalog.watched = False
+
+    def apply(self, paths):
+        """Applique un lot de changements (chemins ou RESCAN) au catalogue et aux registres."""
+        registries = {registry.path: registry for registry in self.registries}
+        for path in paths:
+            if path in registries:
+                registries[path].invalidate()
+        if RESCAN in paths:
+            self.catalog.refresh(force=True)
+        else:
+            self.catalog.apply_changes([path for path in paths if path not in registries])
+
+    def _run_inotify(self):
+        pending = []
+        first_event = None
+        while not self._stop.is_set():
+            events = self._backend.read_events(self.debounce if pending else 1.0)
+            if events:
+                pending.extend(events)
+                first_event = first_event or time.monotonic()
+                # On attend la fin de la rafale, sans dépasser dix fois le délai de regroupement
+                if time.monotonic() - first_event < self.debounce * 10:
+                    continue
+            if pending:
+                batch, pending, first_event = list(dict.fromkeys(pending)), [], None
+                try:
+                    self.apply(batch)
+                except Exception as e:
+                    print(f"Erreur lors de la mise à jour du catalogue : {e}")
+
+    def _run_polling(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.catalog.refresh(force=True)
+            except Exception as e:
+                print(f"Erreur lors de la mise à jour du catalogue : {e}")
@@ -0,0 +1,163 @@
+import fcntl
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import git
+
+from config import GIT_SETTINGS
+
+# Répertoire partagé par les workers gunicorn : l'état des jobs y est stocké en JSON
+JOBS_DIR = GIT_SETTINGS.get('jobs_dir', '/tmp/home-k8s-metadata/git-jobs')
+# Durée de conservation (en secondes) des jobs terminés
+JOBS_RETENTION = GIT_SETTINGS.get('jobs_retention', 3600)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+
+# Un seul thread par worker : les opérations git d'un worker sont exécutées une par une
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='git-job')
+
+
+@contextmanager
+def _file_lock(name):
+    """Verrou exclusif inter-processus (flock) sur un fichier du répertoire des jobs."""
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    with open(os.path.join(JOBS_DIR, name), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_DIR, f"{job_id}.json")
+
+
+def _write_job(job):
+    """Écrit l'état d'un job de manière atomique."""
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=JOBS_DIR, prefix='.job-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(job, f)
+    os.replace(tmp_path, _job_path(job['id']))
+
+
+def get_job(job_id):
+    """Retourne l'état d'un job (quel que soit le worker qui l'exécute), ou None."""
+    # L'identifiant provient de l'URL : on n'accepte qu'un uuid hexadécimal
+    if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+        return None
+    try:
+        with open(_job_path(job_id), 'r') as f:
+            job = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if job['status'] in (QUEUED, RUNNING) and not _is_alive(job['pid']):
+        # Le worker qui portait le job a disparu (redémarrage, crash)
+        job.update(status=FAILED, error="Le worker exécutant ce job s'est arrêté.", finished_at=time.time())
+    return job
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _list_jobs():
+    jobs = []
+    if not os.path.isdir(JOBS_DIR):
+        return jobs
+    for filename in os.listdir(JOBS_DIR):
+        if filename.endswith('.json'):
+            job = get_job(filename[:-len('.json')])
+            if job:
+                jobs.append(job)
+    return jobs
+
+
+def _prune(jobs):
+    """Supprime les jobs terminés depuis plus de JOBS_RETENTION secondes."""
+    now = time.time()
+    for job in jobs:
+        if job['status'] in (SUCCEEDED, FAILED) and now - (job.get('finished_at') or now) > JOBS_RETENTION:
+            try:
+                os.remove(_job_path(job['id']))
+            except FileNotFoundError:
+                pass
+
+
+class _JobProgress(git.RemoteProgress):
+    """Reporte la progression de git (fetch/push) dans l'état du job."""
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self._last_write = 0
+
+    def update(self, op_code, cur_count, max_count=None, message=''):
+        now = time.monotonic()
+        # Limite les écritures sur disque à deux par seconde
+        if now - self._last_write < 0.5:
+            return
+        self._last_write = now
+        line = self._cur_line or message
+        if line:
+            self.job['progress'] = line.strip()
+            _write_job(self.job)
+
+
+def _run(job, operation):
+    # Le verrou sérialise les opérations git entre les workers sur le même dépôt
+    with _file_lock('git.lock'):
+        job.update(status=RUNNING, started_at=time.time())
+        _write_job(job)
+        try:
+            job['result'] = operation(_JobProgress(job))
+            job['status'] = SUCCEEDED
+        except Exception as e:
+            job['error'] = str(e)
+            job['status'] = FAILED
+        job['finished_at'] = time.time()
+        job['progress'] = None
+        _write_job(job)
+
+
+def submit(kind, operation, coalesce=False):
+    """
+    Soumet une opération git en arrière-plan et retourne (job, coalesced).
+    'operation' reçoit un objet de progression et retourne un résultat sérialisable en JSON.
+    Si 'coalesce' est vrai, un job du même type en attente ou en cours est réutilisé.
+    """
+    with _file_lock('submit.lock'):
+        jobs = _list_jobs()
+        _prune(jobs)
+        if coalesce:
+            for job in jobs:
+                if job['kind'] == kind and job['status'] in (QUEUED, RUNNING):
+                    return job, True
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': QUEUED,
+            'pid': os.getpid(),
+            'progress': None,
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        _write_job(job)
+    _executor.submit(_run, job, operation)
+    return job, False
@@ -0,0 +1,230 @@
+import os
+import threading
+import git
+from git.refs.symbolic import SymbolicReference
+
+from config import DATA_PATHS, GIT_SETTINGS
+from services.apps import applications_service, components_service, substitutes_service, ingress_annotations_service
+
+# Registres à fichier unique, par nom
+REGISTRIES = {
+    'components': components_service.registry,
+    'substitutes': substitutes_service.registry,
+    'ingress_annotations': ingress_annotations_service.registry,
+}
+
+
+# Handle git.Repo conservé pour toute la durée de vie du worker. Son magasin d'objets
+# (GitCmdObjectDB) garde ouverts des processus 'git cat-file --batch' réutilisés d'une
+# requête à l'autre, au lieu d'en lancer de nouveaux à chaque accès.
+_repo = None
+_repo_identity = None
+_handle_lock = threading.Lock()
+# Sérialise les opérations git (pull, push) sur le handle partagé au sein du worker
+repo_lock = threading.RLock()
+_head_cache = None
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def get_repo():
+    """
+    Récupère l'objet git.Repo du worker si le chemin est valide.
+    Le handle n'est recréé que si le dépôt a été recloné (nouveau répertoire .git).
+    """
+    global _repo, _repo_identity
+    repo_path = applications_service.REPO_PATH
+    if not repo_path:
+        return None
+    identity = _stat_key(os.path.join(repo_path, '.git'))
+    if identity is None:
+        return None
+    # Seul l'inode identifie le dépôt : la date du répertoire .git change à chaque commit
+    identity = identity[0]
+    with _handle_lock:
+        if _repo is None or identity != _repo_identity:
+            try:
+                _repo = git.Repo(repo_path)
+            except git.InvalidGitRepositoryError:
+                return None
+            _repo_identity = identity
+            invalidate_head()
+        return _repo
+
+
+def sparse_directories():
+    """
+    Répertoires du dépôt utilisés par l'application, d'après data_paths :
+    le répertoire de chaque fichier de registre et la racine des applications,
+    sans ceux déjà inclus dans un autre.
+    """
+    directories = set()
+    for path in DATA_PATHS.values():
+        path = path.strip('/')
+        directory = os.path.dirname(path) if path.endswith(('.yaml', '.yml')) else path
+        if directory:
+            directories.add(directory)
+    return sorted(d for d in directories
+                  if not any(d != other and d.startswith(other + '/') for other in directories))
+
+
+def clone(repo_url, repo_path):
+    """
+    Clone le dépôt selon la stratégie de la section 'git' de config.yaml :
+    historique limité à 'clone_depth' commits (0 = complet), clone partiel
+    'clone_filter' (par exemple 'blob:none' : le contenu des fichiers n'est
+    téléchargé que pour ceux extraits) et extraction limitée aux répertoires
+    de data_paths si 'sparse_checkout' est vrai.
+
+    Le filtre et les répertoires extraits sont enregistrés dans la
+    configuration du dépôt : les pull suivants gardent la même forme et ne
+    récupèrent que les nouveaux commits.
+    """
+    options = {}
+    depth = GIT_SETTINGS.get('clone_depth', 0)
+    if depth:
+        # --depth implique --single-branch : seule la branche par défaut est suivie
+        options['depth'] = depth
+    clone_filter = GIT_SETTINGS.get('clone_filter')
+    if clone_filter:
+        options['filter'] = clone_filter
+    directories = sparse_directories() if GIT_SETTINGS.get('sparse_checkout') else []
+    if directories:
+        # N'extrait d'abord que les fichiers de la racine
+        options['sparse'] = True
+
+    repo = git.Repo.clone_from(repo_url, repo_path, **options)
+    if directories:
+        repo.git.sparse_checkout('set', *directories)
+    return repo
+
+
+def head_commit():
+    """
+    Retourne le sha du commit HEAD, sans lancer de processus git.
+    La valeur est mise en cache jusqu'au prochain déplacement de HEAD (pull, push,
+    commit, y compris depuis un autre worker), détecté via HEAD et son reflog.
+    """
+    global _head_cache
+    repo = get_repo()
+    if repo is None:
+        return None
+    key = (_stat_key(os.path.join(repo.git_dir, 'HEAD')), _stat_key(os.path.join(repo.git_dir, 'logs', 'HEAD')))
+    cached = _head_cache
+    if cached is None or cached[0] != key:
+        # Lecture directe des fichiers de références (HEAD, refs/, packed-refs)
+        cached = (key, SymbolicReference.dereference_recursive(repo, 'HEAD'))
+        _head_cache = cached
+    return cached[1]
+
+
+def invalidate_head():
+    """Oublie le HEAD mis en cache (après un pull ou un push)."""
+    global _head_cache
+    _head_cache = None
+
+
+def changed_paths(repo, old_commit, new_commit):
+    """
+    Retourne les chemins (relatifs au dépôt) ajoutés, modifiés, supprimés ou
+    renommés entre deux commits ; un renommage fournit ses deux chemins.
+    """
+    paths = set()
+    # Sans détection des renommages (qui compare le contenu des fichiers et le
+    # téléchargerait dans un clone partiel) : un renommage apparaît comme une
+    # suppression et un ajout, soit les mêmes deux chemins
+    for diff in old_commit.diff(new_commit, no_renames=True):
+        for path in (diff.a_path, diff.b_path):
+            if path:
+                paths.add(path)
+    return sorted(paths)
+
+
+def apply_changes(relative_paths):
+    """
+    Répercute dans le catalogue en mémoire les fichiers modifiés d'un pull :
+    seuls les fichiers de métadonnées concernés sont relus.
+    Retourne les applications et registres touchés.
+    """
+    repo_path = applications_service.REPO_PATH
+    # Même construction de chemin que les services (REPO_PATH + "/" + chemin relatif)
+    paths = [repo_path + "/" + path for path in relative_paths]
+
+    registries = []
+    for name, registry in REGISTRIES.items():
+        if registry.path in paths:
+            registry.invalidate()
+            registries.append(name)
+
+    applications = applications_service.catalog.apply_changes(paths)
+    return {'applications': applications, 'registries': registries}
+
+
+def pull(repo, progress=None):
+    """
+    Effectue un 'git pull' puis met à jour le catalogue à partir du diff entre
+    l'ancien et le nouveau HEAD, au lieu de tout relire.
+    """
+    with repo_lock:
+        try:
+            return _pull(repo, progress)
+        finally:
+            invalidate_head()
+
+
+def _pull(repo, progress):
+    try:
+        old_head = repo.head.commit
+    except ValueError:
+        # Dépôt sans commit : pas de diff possible
+        old_head = None
+
+    # --no-stat : le résumé des fichiers modifiés obligerait un clone partiel à
+    # télécharger le contenu des fichiers hors des répertoires extraits
+    pull_info = repo.remotes.origin.pull(progress=progress, no_stat=True)
+    new_head = repo.head.commit
+
+    if old_head is None:
+        applications_service.catalog.refresh(force=True)
+        for registry in REGISTRIES.values():
+            registry.invalidate()
+        paths = []
+        changes = {'applications': [], 'registries': list(REGISTRIES)}
+    elif old_head == new_head:
+        paths = []
+        changes = {'applications': [], 'registries': []}
+    else:
+        paths = changed_paths(repo, old_head, new_head)
+        changes = apply_changes(paths)
+
+    return {
+        'pull_info': pull_info,
+        'old_head': old_head.hexsha if old_head is not None else None,
+        'new_head': new_head.hexsha,
+        'changed_files': paths,
+        'changed_applications': changes['applications'],
+        'changed_registries': changes['registries'],
+    }
+
+
+def push(repo, commit_message, progress=None):
+    """Ajoute tous les fichiers modifiés, commite et pousse vers l'origine."""
+    with repo_lock:
+        try:
+            # Ajoute tous les fichiers modifiés/supprimés
+            repo.git.add(all=True)
+            # Commit des changements
+            commit = repo.index.commit(commit_message)
+            # Push vers l'origine
+            push_info = repo.remotes.origin.push(progress=progress)
+            # Les erreurs de push (rejet, non fast-forward) ne lèvent pas d'exception
+            push_info.raise_if_error()
+            return commit
+        finally:
+            invalidate_head()
@@ -40,6 +40,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const dependsOnSelect = document.getElementById('dependsOn');
 
     const dependencyDepthSelect = document.getElementById('dependencyDepth');
+    const dependencyDirectionSelect = document.getElementById('dependencyDirection');
     const graphContainer = document.getElementById('dependencyGraph');
 
     const API_URL_BASE = '/apps/api/applications';
@@ -110,6 +111,8 @@ document.addEventListener('DOMContentLoaded', () => {
             .attr("fill", d => {
                 if (d.type === 'source') {
                     return 'red';
+                } else if (d.type === 'dependent') {
+                    return 'orange';
                 } else {
                     return 'steelblue';
                 }
@@ -155,6 +158,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const appName = nameInput.value.trim();
         const appNamespace = namespaceInput.value.trim();
         const depth = dependencyDepthSelect.value;
+        const direction = dependencyDirectionSelect.value;
         
         if (!appName || !appNamespace) {
             drawGraph({nodes: [], links: []});
@@ -164,7 +168,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const response = await fetch(`${API_URL_BASE}/dependencies`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ app_name: appName, app_namespace: appNamespace, depth: depth === 'all' ? Infinity : parseInt(depth) })
+            // 'all' est transmis tel quel : JSON.stringify(Infinity) donnerait null
+            body: JSON.stringify({ app_name: appName, app_namespace: appNamespace, depth: depth === 'all' ? 'all' : parseInt(depth), direction: direction })
         });
         
         if (response.ok) {
@@ -178,6 +183,7 @@ document.addEventListener('DOMContentLoaded', () => {
     nameInput.addEventListener('input', updateGraph);
     namespaceInput.addEventListener('input', updateGraph);
     dependencyDepthSelect.addEventListener('change', updateGraph);
+    dependencyDirectionSelect.addEventListener('change', updateGraph);
 
     // Fonction pour générer dynamiquement les champs de valeur d'annotations
     const updateAnnotationsValueFields = (existingAnnotations = {}) => {
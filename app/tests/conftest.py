@@ -0,0 +1,47 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+import yaml
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Les modules de l'application lisent config.yaml (chemin relatif) et REPO_PATH
+# dès leur import : on se place dans app/ avec un dépôt jetable, jamais le vrai
+os.chdir(APP_DIR)
+sys.path.insert(0, APP_DIR)
+os.environ['REPO_PATH'] = tempfile.mkdtemp(prefix='home-k8s-metadata-tests-')
+
+
+def write_app(root, base, namespace, name, filename=None, **fields):
+    """Écrit une application dans son fichier, à l'emplacement utilisé par le service."""
+    directory = os.path.join(root, base, namespace)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename or f"{base}_{namespace}_{name}.yaml")
+    app = dict({'active': True, 'name': name, 'namespace': namespace, 'base': base}, **fields)
+    with open(path, 'w') as f:
+        yaml.dump({'apps': {name: app}}, f, sort_keys=False)
+    return path
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(os.environ['REPO_PATH'], ignore_errors=True)
+
+
+@pytest.fixture
+def repo():
+    """
+    Dépôt de métadonnées vide pour les services, remis à zéro à chaque test.
+    Retourne le répertoire des applications.
+    """
+    from services.apps import applications_service
+
+    metadatas = os.path.join(os.environ['REPO_PATH'], 'metadatas')
+    shutil.rmtree(metadatas, ignore_errors=True)
+    os.makedirs(applications_service.ROOT_PATH)
+    applications_service.catalog.refresh(force=True)
+    yield applications_service.ROOT_PATH
+    shutil.rmtree(metadatas, ignore_errors=True)
+    applications_service.catalog.refresh(force=True)
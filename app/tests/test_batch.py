@@ -0,0 +1,102 @@
+import os
+
+import pytest
+import yaml
+
+from conftest import write_app
+from services.apps import applications_service
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_batch_applies_all_operations(repo):
+    write_app(repo, 'apps', 'ns1', 'web')
+    write_app(repo, 'apps', 'ns1', 'old')
+    applications_service.catalog.refresh(force=True)
+
+    applied, results = applications_service.apply_batch([
+        {'op': 'create', 'data': {'name': 'api', 'namespace': 'ns1', 'base': 'apps'}},
+        {'op': 'update', 'base': 'apps', 'name': 'web', 'namespace': 'ns1', 'data': {'interval': '5m'}},
+        {'op': 'delete', 'base': 'apps', 'name': 'old', 'namespace': 'ns1'},
+    ])
+
+    assert applied
+    assert [result['status'] for result in results] == ['ok', 'ok', 'ok']
+    assert applications_service.get_application('api', 'ns1') is not None
+    assert applications_service.get_application('web', 'ns1')['interval'] == '5m'
+    assert applications_service.get_application('old', 'ns1') is None
+    assert not os.path.exists(os.path.join(repo, 'apps', 'ns1', 'apps_ns1_old.yaml'))
+
+
+def test_invalid_operation_rejects_whole_batch(repo):
+    path = write_app(repo, 'apps', 'ns1', 'web')
+    applications_service.catalog.refresh(force=True)
+    before = _read(path)
+
+    applied, results = applications_service.apply_batch([
+        {'op': 'update', 'base': 'apps', 'name': 'web', 'namespace': 'ns1', 'data': {'interval': '5m'}},
+        {'op': 'delete', 'base': 'apps', 'name': 'missing', 'namespace': 'ns1'},
+    ])
+
+    assert not applied
+    assert [result['status'] for result in results] == ['not_applied', 'error']
+    assert _read(path) == before
+
+
+def test_dry_run_writes_nothing(repo):
+    applied, results = applications_service.apply_batch(
+        [{'op': 'create', 'data': {'name': 'api', 'namespace': 'ns1', 'base': 'apps'}}], dry_run=True)
+
+    assert applied
+    assert results[0]['status'] == 'ok'
+    assert applications_service.get_application('api', 'ns1') is None
+    assert not os.path.exists(os.path.join(repo, 'apps', 'ns1', 'apps_ns1_api.yaml'))
+
+
+def test_failed_write_restores_replaced_files(repo, monkeypatch):
+    first = write_app(repo, 'apps', 'ns1', 'a')
+    second = write_app(repo, 'apps', 'ns1', 'b')
+    applications_service.catalog.refresh(force=True)
+    originals = {path: _read(path) for path in (first, second)}
+
+    real_replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise OSError('disk full')
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        applications_service.apply_batch([
+            {'op': 'update', 'base': 'apps', 'name': 'a', 'namespace': 'ns1', 'data': {'interval': '1m'}},
+            {'op': 'update', 'base': 'apps', 'name': 'b', 'namespace': 'ns1', 'data': {'interval': '1m'}},
+        ])
+    monkeypatch.undo()
+
+    assert {path: _read(path) for path in (first, second)} == originals
+    assert [name for name in os.listdir(os.path.dirname(first)) if name.endswith('.tmp')] == []
+    assert applications_service.get_application('a', 'ns1').get('interval') is None
+
+
+def test_batch_keeps_other_applications_of_the_file(repo):
+    path = os.path.join(repo, 'apps', 'ns1', 'apps_ns1_web.yaml')
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        yaml.dump({'apps': {
+            'web': {'name': 'web', 'namespace': 'ns1', 'base': 'apps'},
+            'extra': {'name': 'extra', 'namespace': 'ns1', 'base': 'apps'},
+        }}, f, sort_keys=False)
+    applications_service.catalog.refresh(force=True)
+
+    applied, _ = applications_service.apply_batch(
+        [{'op': 'update', 'base': 'apps', 'name': 'web', 'namespace': 'ns1', 'data': {'interval': '5m'}}])
+
+    assert applied
+    with open(path) as f:
+        assert set(yaml.safe_load(f)['apps']) == {'web', 'extra'}
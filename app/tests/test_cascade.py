@@ -0,0 +1,59 @@
+import pytest
+from flask import Flask
+
+from routes import cascade
+from services.apps import components_service, references_service, substitutes_service
+
+
+@pytest.fixture
+def components(repo):
+    components_service.save_data([{'nom': 'nginx'}, {'nom': 'redis', 'description': 'cache'}, {'nom': 'postgres'}])
+    return components_service
+
+
+def test_delete_returns_removed_entries_with_positions(components):
+    assert components.delete_component('redis') == [(1, {'nom': 'redis', 'description': 'cache'})]
+    assert components.delete_component('redis') == []
+    assert [c['nom'] for c in components.load_data()] == ['nginx', 'postgres']
+
+
+def test_restore_puts_entry_back_at_its_position(components):
+    removed = components.delete_component('redis')
+
+    assert components.restore_component(removed)
+    assert components.load_data() == [{'nom': 'nginx'}, {'nom': 'redis', 'description': 'cache'}, {'nom': 'postgres'}]
+
+
+def test_restore_skips_a_recreated_name(components):
+    removed = components.delete_component('redis')
+    components.create_component({'nom': 'redis'})
+
+    assert not components.restore_component(removed)
+    assert [c['nom'] for c in components.load_data()] == ['nginx', 'postgres', 'redis']
+
+
+def test_failed_cascade_undoes_the_registry_delete(repo, monkeypatch):
+    substitutes_service.save_data([{'nom': 'host'}, {'nom': 'port'}, {'nom': 'user'}])
+
+    def failing_cascade(kind, old, new=None, dry_run=False):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(references_service, 'cascade', failing_cascade)
+    app = Flask(__name__)
+    with app.test_request_context('/?cascade=true'):
+        assert cascade.options() == (True, False)
+        removed = substitutes_service.delete_substitute('port')
+        response, status = cascade.apply('substitutes', 'port', None, ('', 204),
+                                         lambda: substitutes_service.restore_substitute(removed))
+
+    assert status == 500
+    assert 'disk full' in response.get_json()['error']
+    assert [s['nom'] for s in substitutes_service.load_data()] == ['host', 'port', 'user']
+
+
+def test_cascade_is_opt_in():
+    app = Flask(__name__)
+    with app.test_request_context('/'):
+        assert cascade.options() == (False, False)
+    with app.test_request_context('/?dry_run=1'):
+        assert cascade.options() == (False, True)
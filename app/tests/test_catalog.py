@@ -0,0 +1,78 @@
+import os
+
+from conftest import write_app
+from services.apps.catalog import ApplicationCatalog
+
+
+def test_applications_sorted_by_name(tmp_path):
+    write_app(tmp_path, 'apps', 'ns1', 'zeta')
+    write_app(tmp_path, 'apps', 'ns1', 'Alpha')
+    write_app(tmp_path, 'infra', 'ns2', 'beta')
+
+    catalog = ApplicationCatalog(str(tmp_path))
+
+    assert [app['name'] for app in catalog.applications()] == ['Alpha', 'beta', 'zeta']
+
+
+def test_query_uses_secondary_indexes(tmp_path):
+    write_app(tmp_path, 'apps', 'ns1', 'web', components=[{'path': 'nginx'}], substitute=[{'key': 'host', 'value': 'a'}])
+    write_app(tmp_path, 'apps', 'ns2', 'api', components=['nginx', 'redis'])
+    write_app(tmp_path, 'infra', 'ns1', 'db', components=['postgres'], active=False)
+    catalog = ApplicationCatalog(str(tmp_path))
+
+    names = lambda applications: [app['name'] for app in applications]
+    assert names(catalog.query(component='nginx')) == ['api', 'web']
+    assert names(catalog.query(component='nginx', namespace='ns1')) == ['web']
+    assert names(catalog.query(namespace='ns1', base='infra')) == ['db']
+    assert names(catalog.query(substitute='host')) == ['web']
+    assert names(catalog.query(namespace='ns1', active=True)) == ['web']
+    assert names(catalog.query(name_prefix='A')) == ['api']
+    assert catalog.query(component='missing') == []
+
+
+def test_get_and_indexes_follow_invalidated_writes(tmp_path):
+    path = write_app(tmp_path, 'apps', 'ns1', 'web', components=['nginx'])
+    catalog = ApplicationCatalog(str(tmp_path), scan_interval=3600)
+    assert catalog.get('web', 'ns1')['components'] == ['nginx']
+
+    write_app(tmp_path, 'apps', 'ns1', 'web', components=['caddy'])
+    catalog.invalidate(path)
+
+    assert catalog.get('web', 'ns1')['components'] == ['caddy']
+    assert catalog.query(component='nginx') == []
+    assert [app['name'] for app in catalog.query(component='caddy')] == ['web']
+
+    os.remove(path)
+    catalog.invalidate(path)
+    assert catalog.get('web', 'ns1') is None
+    assert catalog.applications() == []
+
+
+def test_duplicates_resolve_to_first_file_in_walk_order(tmp_path):
+    first = write_app(tmp_path, 'apps', 'ns1', 'web', filename='a.yaml', interval='1m')
+    second = write_app(tmp_path, 'apps', 'ns1', 'web', filename='b.yaml', interval='2m')
+    catalog = ApplicationCatalog(str(tmp_path))
+
+    winner = catalog.get('web', 'ns1')
+    in_walk_order = [path for path in catalog._files if path in (first, second)]
+    assert winner['full_path'] == in_walk_order[0]
+    # La liste triée garde les deux copies, les index une seule
+    assert len(catalog.applications()) == 2
+    assert catalog.size() == 1
+    assert catalog.query(namespace='ns1') == [winner]
+
+    # Le fichier retenu disparaît : l'homonyme prend sa place
+    os.remove(in_walk_order[0])
+    catalog.invalidate(in_walk_order[0])
+    assert catalog.get('web', 'ns1')['full_path'] == in_walk_order[1]
+    assert catalog.query(namespace='ns1') == [catalog.get('web', 'ns1')]
+
+
+def test_invalid_file_is_skipped(tmp_path):
+    write_app(tmp_path, 'apps', 'ns1', 'web')
+    broken = tmp_path / 'apps' / 'ns1' / 'broken.yaml'
+    broken.write_text('apps: [unclosed\n')
+
+    catalog = ApplicationCatalog(str(tmp_path))
+
+    assert [app['name'] for app in catalog.applications()] == ['web']
@@ -0,0 +1,53 @@
+from services.apps.dependency_index import DependencyIndex
+from services.apps.graph_analytics import GraphAnalytics
+
+
+def _analytics(dependencies):
+    """Analyses d'un graphe {nom: [noms des dépendances]}, tout dans le namespace 'ns'."""
+    apps = {
+        (name, 'ns'): {'name': name, 'namespace': 'ns', 'dependsOn': [{'name': dep, 'namespace': 'ns'} for dep in deps]}
+        for name, deps in dependencies.items()
+    }
+    return GraphAnalytics(DependencyIndex(apps))
+
+
+def test_acyclic_graph_has_no_cycles_and_a_topological_order():
+    analytics = _analytics({'web': ['api'], 'api': ['db'], 'db': [], 'cron': ['db']})
+
+    assert analytics.cycles() == []
+    order = analytics.topological_order()
+    assert order.index('db:ns') < order.index('api:ns') < order.index('web:ns')
+    assert order.index('db:ns') < order.index('cron:ns')
+
+
+def test_cycles_are_reported_once_with_sorted_members():
+    analytics = _analytics({'a': ['b'], 'b': ['c'], 'c': ['a'], 'd': ['d'], 'e': ['a']})
+
+    assert sorted(analytics.cycles()) == [['a:ns', 'b:ns', 'c:ns'], ['d:ns']]
+
+
+def test_reachability_is_transitive_and_directed():
+    analytics = _analytics({'web': ['api'], 'api': ['db'], 'db': [], 'cron': []})
+
+    assert analytics.is_upstream('db:ns', 'web:ns')
+    assert analytics.is_upstream('api:ns', 'web:ns')
+    assert not analytics.is_upstream('web:ns', 'db:ns')
+    assert not analytics.is_upstream('cron:ns', 'web:ns')
+    assert not analytics.is_upstream('db:ns', 'db:ns')
+    assert not analytics.is_upstream('unknown:ns', 'web:ns')
+
+
+def test_reachability_inside_a_cycle():
+    analytics = _analytics({'a': ['b'], 'b': ['a'], 'c': ['a']})
+
+    assert analytics.is_upstream('a:ns', 'b:ns')
+    assert analytics.is_upstream('b:ns', 'a:ns')
+    assert analytics.is_upstream('b:ns', 'c:ns')
+    assert not analytics.is_upstream('c:ns', 'a:ns')
+
+
+def test_missing_dependencies_are_nodes():
+    analytics = _analytics({'web': ['external']})
+
+    assert analytics.is_upstream('external:ns', 'web:ns')
+    assert analytics.topological_order() == ['external:ns', 'web:ns']
@@ -0,0 +1,91 @@
+import pytest
+from flask import Flask
+
+from routes import http_cache
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    state = {'version': 1, 'builds': 0, 'renders': 0}
+
+    def build():
+        state['builds'] += 1
+        return {'version': state['version']}
+
+    def render():
+        state['renders'] += 1
+        return f"<p>{state['version']}</p>"
+
+    @app.route('/data')
+    def data():
+        return http_cache.cached_json('test_data', state['version'], build)
+
+    @app.route('/page')
+    def page():
+        return http_cache.cached_html('test_page', state['version'], render)
+
+    @app.route('/uncached')
+    def uncached():
+        return http_cache.cached_json('test_uncached', None, build)
+
+    http_cache._bodies.clear()
+    client = app.test_client()
+    client.state = state
+    yield client
+    http_cache._bodies.clear()
+
+
+def test_body_is_built_once_per_version(client):
+    first = client.get('/data')
+    second = client.get('/data')
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == {'version': 1}
+    assert first.data == second.data
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert 'no-cache' in first.headers['Cache-Control']
+    assert client.state['builds'] == 1
+
+
+def test_matching_etag_returns_304(client):
+    etag = client.get('/data').headers['ETag']
+
+    response = client.get('/data', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert client.state['builds'] == 1
+
+
+def test_new_version_changes_etag(client):
+    etag = client.get('/data').headers['ETag']
+    client.state['version'] = 2
+
+    response = client.get('/data', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'version': 2}
+    assert response.headers['ETag'] != etag
+
+
+def test_same_content_keeps_etag_across_versions(client):
+    client.state['version'] = None
+    response = client.get('/uncached')
+    etag = response.headers['ETag']
+
+    # Sans version, rien n'est mis en cache mais l'ETag reste celle du contenu
+    assert client.get('/uncached', headers={'If-None-Match': etag}).status_code == 304
+    assert client.state['builds'] == 2
+
+
+def test_html_page_is_cached_with_etag(client):
+    first = client.get('/page')
+    assert first.status_code == 200
+    assert first.mimetype == 'text/html'
+    assert first.data == b'<p>1</p>'
+
+    response = client.get('/page', headers={'If-None-Match': first.headers['ETag']})
+
+    assert response.status_code == 304
+    assert client.state['renders'] == 1
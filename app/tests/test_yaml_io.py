@@ -0,0 +1,32 @@
+import pytest
+import yaml
+
+import yaml_io
+
+DOCUMENTS = [
+    {'apps': {'web': {'active': True, 'name': 'web', 'namespace': 'ns1', 'components': [{'path': 'nginx'}],
+                      'dependsOn': [{'name': 'db', 'namespace': 'ns1'}], 'interval': '5m', 'timeout': None}}},
+    {'metadatas': {'apps': {'components': [{'nom': 'comp/with/slashes'}, {'nom': 'éàü unicode'}]}}},
+    {'text': 'a "quoted" value', 'long': 'word ' * 40, 'multiline': 'line one\nline two\n'},
+    {'numbers': [1, 1.5, -3, 10 ** 20], 'strings': ['1', 'true', 'null', '', '0o17', 'yes']},
+    {'nested': {'empty_list': [], 'empty_dict': {}, 'key: with colon': 'value # not a comment'}},
+]
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+@pytest.mark.parametrize('sort_keys', [True, False])
+def test_dump_matches_pyyaml_byte_for_byte(document, sort_keys):
+    assert yaml_io.dump(document, sort_keys=sort_keys) == yaml.dump(document, sort_keys=sort_keys)
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_safe_load_round_trip(document):
+    assert yaml_io.safe_load(yaml_io.dump(document)) == yaml.safe_load(yaml.dump(document)) == document
+
+
+def test_dump_to_stream(tmp_path):
+    path = tmp_path / 'out.yaml'
+    with open(path, 'w') as f:
+        yaml_io.dump(DOCUMENTS[0], f, sort_keys=False)
+
+    assert path.read_text() == yaml.dump(DOCUMENTS[0], sort_keys=False)
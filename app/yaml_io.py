@@ -0,0 +1,46 @@
+# backend/yaml_io.py
+"""
+Lecture et écriture YAML partagées par les services.
+
+Utilise les liaisons LibYAML (CSafeLoader / CSafeDumper) lorsqu'elles sont
+disponibles et revient à l'implémentation pure Python sinon.
+"""
+import yaml
+
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _CDumper
+except ImportError:
+    from yaml import SafeLoader as _Loader
+    _CDumper = None
+
+# Vrai si PyYAML a été compilé avec LibYAML
+LIBYAML = _CDumper is not None
+
+
+def safe_load(stream):
+    """Équivalent de yaml.safe_load, accéléré par LibYAML si possible."""
+    return yaml.load(stream, Loader=_Loader)
+
+
+def dump(data, stream=None, **kwargs):
+    """
+    Équivalent de yaml.dump, produisant exactement les mêmes octets.
+
+    L'émetteur C ne replie pas les scalaires entre guillemets doubles comme
+    l'émetteur Python : si la sortie en contient, on la régénère en pur Python
+    pour ne pas introduire de différences dans les diffs git.
+    """
+    text = None
+    if _CDumper is not None:
+        try:
+            text = yaml.dump(data, Dumper=_CDumper, **kwargs)
+        except yaml.representer.RepresenterError:
+            # Types non gérés par le dumper "safe" : on laisse faire yaml.dump
+            text = None
+        if text is not None and '"' in text:
+            text = None
+    if text is None:
+        text = yaml.dump(data, **kwargs)
+    if stream is None:
+        return text
+    stream.write(text)
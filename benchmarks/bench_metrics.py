@@ -0,0 +1,80 @@
+"""
+Mesure le coût de l'instrumentation Prometheus (voir app/metrics.py).
+
+    python benchmarks/bench_metrics.py --requests 20000
+    PROMETHEUS_MULTIPROC_DIR=/tmp/prom python benchmarks/bench_metrics.py
+
+Compare la durée d'une requête minimale via le client de test Flask, avec
+et sans setup_metrics, et le coût unitaire des opérations sur les métriques
+(observation d'histogramme, incrément de compteur). En mode multiprocessus,
+les valeurs sont écrites dans des fichiers projetés en mémoire : le
+répertoire doit exister et être vide.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from flask import Flask
+
+import metrics
+
+
+def _app(instrumented):
+    app = Flask(__name__)
+    if instrumented:
+        metrics.setup_metrics(app)
+
+    @app.route('/api/items/<name>')
+    def item(name):
+        return {'name': name}
+
+    return app
+
+
+def _per_request(app, count):
+    client = app.test_client()
+    for _ in range(200):
+        client.get('/api/items/warmup')
+    start = time.perf_counter()
+    for i in range(count):
+        client.get(f"/api/items/{i}")
+    return (time.perf_counter() - start) / count
+
+
+def _per_call(fn, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    if metrics.prometheus_client is None:
+        print("prometheus_client n'est pas installé : l'instrumentation est sans effet")
+        return 1
+
+    # Meilleure de trois séries pour chaque variante
+    plain = min(_per_request(_app(False), args.requests) for _ in range(3))
+    instrumented = min(_per_request(_app(True), args.requests) for _ in range(3))
+    histogram = _per_call(lambda: metrics.REQUEST_SECONDS.labels('GET', '/bench', 200).observe(0.001), args.calls)
+    counter = _per_call(lambda: metrics.cache_result('bench', True), args.calls)
+
+    print(f"Mode multiprocessus : {'oui' if metrics.MULTIPROC_DIR else 'non'}")
+    print(f"  requête sans métriques      {plain * 1e6:8.1f} µs")
+    print(f"  requête avec métriques      {instrumented * 1e6:8.1f} µs")
+    print(f"  surcoût par requête         {(instrumented - plain) * 1e6:8.1f} µs ({(instrumented / plain - 1) * 100:+.1f} %)")
+    print(f"  observation d'histogramme   {histogram * 1e6:8.2f} µs")
+    print(f"  incrément de compteur       {counter * 1e6:8.2f} µs")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
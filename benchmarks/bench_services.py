@@ -0,0 +1,232 @@
+"""
+Mesure les fonctions des services sur une arborescence metadatas/ synthétique.
+
+    python benchmarks/bench_services.py --apps 3000 --output results.json
+    python benchmarks/bench_services.py --apps 3000 --compare results.json
+
+Cas mesurés : chargement du catalogue (à froid et à chaud), get_application,
+get_dependency_tree à plusieurs profondeurs, get_all_dependencies_graph_data,
+save_data et les opérations CRUD des registres (components, substitutes,
+annotations d'ingress).
+
+Les résultats (temps minimal, médian et moyen en millisecondes par cas) sont
+écrits en JSON avec les paramètres de génération. Avec --compare, chaque cas
+est comparé au fichier de référence : le script échoue si un temps médian
+dépasse celui de la référence de plus de --threshold (x1.25 par défaut).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from generator import generate
+
+# Profondeurs mesurées pour get_dependency_tree (None = tout le graphe)
+TREE_DEPTHS = [1, 2, 4, None]
+
+
+def _measure(fn, repeat):
+    """Exécute 'fn' 'repeat' fois ; retourne les durées en ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(timings):
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'runs': len(timings),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _registry_cases(name, create, update, delete, repeat):
+    """Création, renommage puis suppression d'une entrée de registre, mesurés séparément."""
+    counter = iter(range(10 ** 9))
+    results = {}
+    names = []
+
+    def do_create():
+        entry = f"bench-{name}-{next(counter)}"
+        create(entry)
+        names.append(entry)
+    results[f"{name}.create"] = _measure(do_create, repeat)
+
+    renamed = []
+
+    def do_update():
+        entry = names.pop()
+        update(entry, f"{entry}-renamed")
+        renamed.append(f"{entry}-renamed")
+    results[f"{name}.update"] = _measure(do_update, repeat)
+    results[f"{name}.delete"] = _measure(lambda: delete(renamed.pop()), repeat)
+    return results
+
+
+def run(args, root):
+    """Génère l'arborescence sous 'root', importe les services sur celle-ci et mesure chaque cas."""
+    generate(root, apps=args.apps, namespaces=args.namespaces, seed=args.seed, bases=args.bases,
+             fan_out=args.fan_out, depth=args.depth, helm=args.helm, components=args.components,
+             substitutes=args.substitutes, annotations=args.annotations)
+
+    # Les services lisent REPO_PATH et config.yaml (relatif au répertoire courant) à l'import
+    os.environ['REPO_PATH'] = root
+    os.chdir(APP_DIR)
+    from services.apps import applications_service, components_service, substitutes_service, ingress_annotations_service
+    from services.apps.catalog import ApplicationCatalog
+
+    results = {}
+
+    def cold_load():
+        catalog = ApplicationCatalog(applications_service.ROOT_PATH)
+        catalog.applications()
+    results['load_data.cold'] = _measure(cold_load, args.repeat)
+    applications_service.load_data()
+    results['load_data.warm'] = _measure(applications_service.load_data, args.repeat * 10)
+
+    apps = applications_service.load_data()
+    # La dernière application générée a la plus longue chaîne de dépendances, app-0 le plus de dépendants
+    target = max(apps, key=lambda app: int(app['name'].split('-')[-1]))
+    results['get_application'] = _measure(
+        lambda: applications_service.get_application(target['name'], target['namespace']), args.repeat * 10)
+
+    for depth in TREE_DEPTHS:
+        label = 'all' if depth is None else depth
+        for direction in ('dependencies', 'dependents'):
+            results[f"get_dependency_tree.{direction}.depth_{label}"] = _measure(
+                lambda: applications_service.get_dependency_tree(
+                    target['name'] if direction == 'dependencies' else 'app-0',
+                    target['namespace'] if direction == 'dependencies' else 'namespace-0',
+                    float('inf') if depth is None else depth, direction),
+                args.repeat)
+
+    results['get_all_dependencies_graph_data'] = _measure(applications_service.get_all_dependencies_graph_data, args.repeat)
+
+    def save():
+        data = dict(applications_service.get_application(target['name'], target['namespace']))
+        data['interval'] = f"{len(results) % 60}m"
+        applications_service.save_data(data)
+    results['save_data'] = _measure(save, args.repeat)
+
+    results.update(_registry_cases(
+        'components',
+        lambda nom: components_service.create_component({'nom': nom}),
+        lambda old, new: components_service.update_component(old, {'nom': new}),
+        components_service.delete_component,
+        args.repeat))
+    results.update(_registry_cases(
+        'substitutes',
+        substitutes_service.create_substitute,
+        substitutes_service.update_substitute,
+        substitutes_service.delete_substitute,
+        args.repeat))
+    results.update(_registry_cases(
+        'ingress_annotations',
+        ingress_annotations_service.create_annotation,
+        ingress_annotations_service.update_annotation,
+        ingress_annotations_service.delete_annotation,
+        args.repeat))
+
+    return {
+        'meta': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'threshold', 'min_ms')},
+            'applications': len(apps),
+        },
+        'results': {case: _summary(timings) for case, timings in results.items()},
+    }
+
+
+def compare(report, baseline, threshold, min_ms=0.05):
+    """
+    Affiche l'évolution de chaque cas ; retourne la liste des régressions.
+    Les cas plus rapides que 'min_ms' (trop sensibles au bruit) ne sont pas signalés.
+    """
+    regressions = []
+    print(f"Comparaison avec {baseline['meta'].get('revision')} ({baseline['meta'].get('date')}) :")
+    for case, result in report['results'].items():
+        reference = baseline['results'].get(case)
+        if reference is None or not reference['median_ms']:
+            continue
+        ratio = result['median_ms'] / reference['median_ms']
+        flag = ''
+        if ratio > threshold and result['median_ms'] >= min_ms:
+            flag = '  <-- régression'
+            regressions.append(case)
+        print(f"  {case:<52} {reference['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apps', type=int, default=2000)
+    parser.add_argument('--namespaces', type=int, default=20)
+    parser.add_argument('--bases', type=int, default=3)
+    parser.add_argument('--fan-out', type=int, default=3)
+    parser.add_argument('--depth', type=int, default=None)
+    parser.add_argument('--no-helm', dest='helm', action='store_false')
+    parser.add_argument('--components', type=int, default=30)
+    parser.add_argument('--substitutes', type=int, default=15)
+    parser.add_argument('--annotations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="fichier JSON des résultats")
+    parser.add_argument('--compare', help="fichier JSON de référence")
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--min-ms', type=float, default=0.05, help="durée en dessous de laquelle un cas n'est pas signalé")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+
+    root = tempfile.mkdtemp(prefix='bench-metadata-')
+    try:
+        report = run(args, root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print(f"{report['meta']['applications']} applications")
+    for case, result in report['results'].items():
+        print(f"  {case:<52} {result['median_ms']:10.3f} ms (min {result['min_ms']:.3f})")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Résultats écrits dans {output}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold, args.min_ms)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de x{args.threshold}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
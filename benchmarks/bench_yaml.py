@@ -0,0 +1,65 @@
+"""
+Compare le chargement et l'écriture YAML en pur Python et via yaml_io (LibYAML).
+
+    python benchmarks/bench_yaml.py --apps 2000
+
+Vérifie aussi que yaml_io.dump produit exactement les mêmes octets que yaml.dump.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import yaml
+import yaml_io
+from generator import generate
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--apps', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        metadatas = generate(root, apps=args.apps)
+        paths = [os.path.join(r, f) for r, _, files in os.walk(metadatas) for f in files if f.endswith('.yaml')]
+        texts = []
+        for path in paths:
+            with open(path) as f:
+                texts.append(f.read())
+
+    docs = [yaml.safe_load(text) for text in texts]
+    mismatches = sum(1 for doc in docs if yaml_io.dump(doc, sort_keys=False) != yaml.dump(doc, sort_keys=False))
+
+    results = {
+        'load (yaml.safe_load)': _timed(lambda: [yaml.safe_load(t) for t in texts], args.repeat),
+        'load (yaml_io.safe_load)': _timed(lambda: [yaml_io.safe_load(t) for t in texts], args.repeat),
+        'dump (yaml.dump)': _timed(lambda: [yaml.dump(d, sort_keys=False) for d in docs], args.repeat),
+        'dump (yaml_io.dump)': _timed(lambda: [yaml_io.dump(d, sort_keys=False) for d in docs], args.repeat),
+    }
+
+    print(f"{len(texts)} fichiers, LibYAML disponible : {yaml_io.LIBYAML}")
+    for label, seconds in results.items():
+        print(f"  {label:<28} {seconds * 1000:9.1f} ms")
+    print(f"  accélération load : x{results['load (yaml.safe_load)'] / results['load (yaml_io.safe_load)']:.1f}")
+    print(f"  accélération dump : x{results['dump (yaml.dump)'] / results['dump (yaml_io.dump)']:.1f}")
+    print(f"  sorties différentes : {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Générateur d'arborescences 'metadatas/' synthétiques pour les benchmarks.
+
+    python benchmarks/generator.py /tmp/metadata-repo --apps 2000
+    python benchmarks/generator.py /tmp/metadata-repo --apps 5000 --fan-out 6 --depth 10 --no-helm
+
+Les paramètres règlent le volume (applications, namespaces, bases), la forme
+du graphe de dépendances (fan-out maximal, profondeur des chaînes), la taille
+des valeurs helm et celle des registres.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import yaml_io
+
+BASES = ['apps', 'infrastructure', 'core']
+
+
+def _helm_values(rng, env_size=8):
+    """Valeurs helm représentatives (images, ressources, listes d'environnement)."""
+    return {
+        'chart': rng.choice(['app-template', 'nginx', 'postgresql', 'redis']),
+        'version': f"{rng.randint(1, 5)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}",
+        'values': {
+            'image': {'repository': f"ghcr.io/home/{rng.randint(0, 999)}", 'tag': f"v{rng.randint(1, 9)}.0"},
+            'resources': {
+                'requests': {'cpu': f"{rng.randint(10, 500)}m", 'memory': f"{rng.randint(64, 1024)}Mi"},
+                'limits': {'memory': f"{rng.randint(128, 2048)}Mi"},
+            },
+            'env': [{'name': f"VAR_{i}", 'value': f"value-{rng.randint(0, 99999)}"} for i in range(rng.randint(0, env_size))],
+        },
+    }
+
+
+def _layers(apps, depth):
+    """Bornes [début, fin) de chaque niveau lorsque les chaînes ont une profondeur fixée."""
+    count = min(depth + 1, apps) or 1
+    starts = [level * apps // count for level in range(count)] + [apps]
+    return list(zip(starts, starts[1:]))
+
+
+def generate(root, apps=1000, namespaces=20, seed=42, bases=3, fan_out=3, depth=None,
+             helm=True, helm_env=8, components=30, substitutes=15, annotations=10):
+    """
+    Construit sous 'root' une arborescence metadatas/ contenant 'apps' applications
+    réparties sur 'namespaces' namespaces et 'bases' bases, ainsi que les registres
+    associés ('components', 'substitutes' et 'annotations' entrées).
+
+    Chaque application dépend d'au plus 'fan_out' applications. Sans 'depth',
+    les dépendances sont tirées parmi les applications précédentes ; avec
+    'depth', les applications sont réparties en depth + 1 niveaux et chacune
+    dépend d'au moins une application du niveau précédent : la plus longue
+    chaîne compte exactement 'depth' dépendances.
+    Sans 'helm', les applications n'ont pas de valeurs helm ; sinon 'helm_env'
+    borne la taille de leur liste d'environnement.
+    """
+    rng = random.Random(seed)
+    metadatas = os.path.join(root, 'metadatas')
+    base_names = BASES[:bases] + [f"base-{i}" for i in range(len(BASES), bases)]
+    components = [{'nom': f"component-{i}"} for i in range(components)]
+    substitutes = [{'nom': f"substitute-{i}"} for i in range(substitutes)]
+    annotations = [{'nom': f"nginx.ingress.kubernetes.io/annotation-{i}"} for i in range(annotations)]
+    layers = _layers(apps, depth) if depth is not None else None
+    os.makedirs(os.path.join(metadatas, 'apps'), exist_ok=True)
+    for filename, key, entries in (('components.yaml', 'components', components),
+                                   ('substitutes.yaml', 'substitutes', substitutes),
+                                   ('ingress_annotations.yaml', 'ingress_annotations', annotations)):
+        with open(os.path.join(metadatas, filename), 'w') as f:
+            yaml_io.dump({'metadatas': {'apps': {key: entries}}}, f, sort_keys=False)
+
+    for i in range(apps):
+        base = rng.choice(base_names)
+        namespace = f"namespace-{i % namespaces}"
+        name = f"app-{i}"
+        if layers is None:
+            candidates, minimum = range(i), 0
+        else:
+            level = next(level for level, (start, end) in enumerate(layers) if start <= i < end)
+            candidates = range(*layers[level - 1]) if level else range(0)
+            minimum = min(1, fan_out)
+        depends_on = [{'name': f"app-{j}", 'namespace': f"namespace-{j % namespaces}"}
+                      for j in rng.sample(candidates, min(len(candidates), rng.randint(minimum, fan_out)))]
+        app = {
+            'active': rng.random() > 0.1,
+            'name': name,
+            'namespace': namespace,
+            'base': base,
+            'prune': rng.random() > 0.5,
+            'interval': '10m',
+            # Mêmes formes que celles enregistrées par l'interface : [{path}] et [{key, value}]
+            'components': [{'path': c['nom']} for c in rng.sample(components, rng.randint(0, 3))],
+            'dependsOn': depends_on,
+            'ingress': {
+                'host': f"{name}.home.example",
+                'annotations': {a['nom']: 'true' for a in rng.sample(annotations, rng.randint(0, 2))},
+            },
+            'helm': _helm_values(rng, helm_env) if helm else None,
+            'substitute': [{'key': s['nom'], 'value': f"{name}-{s['nom']}"}
+                           for s in rng.sample(substitutes, rng.randint(0, 2))],
+        }
+        if app['helm'] is None:
+            del app['helm']
+        path = os.path.join(metadatas, 'apps', base, namespace, f"{base}_{namespace}_{name}.yaml")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            yaml_io.dump({'apps': {name: app}}, f, sort_keys=False)
+    return metadatas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('root')
+    parser.add_argument('--apps', type=int, default=1000)
+    parser.add_argument('--namespaces', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bases', type=int, default=3)
+    parser.add_argument('--fan-out', type=int, default=3, help="nombre maximal de dépendances par application")
+    parser.add_argument('--depth', type=int, default=None, help="profondeur des chaînes de dépendances")
+    parser.add_argument('--no-helm', dest='helm', action='store_false', help="applications sans valeurs helm")
+    parser.add_argument('--helm-env', type=int, default=8, help="taille maximale des listes d'environnement helm")
+    parser.add_argument('--components', type=int, default=30)
+    parser.add_argument('--substitutes', type=int, default=15)
+    parser.add_argument('--annotations', type=int, default=10)
+    args = parser.parse_args()
+    print(generate(args.root, args.apps, args.namespaces, args.seed, args.bases, args.fan_out, args.depth,
+                   args.helm, args.helm_env, args.components, args.substitutes, args.annotations))